@@ -0,0 +1,23 @@
+import timeit
+
+from paaaaath import Path, PurePath
+
+NUMBER = 100000
+
+URIS = {
+    "s3": "s3://bucket/prefix/dir/file.txt",
+    "gs": "gs://bucket/prefix/dir/file.txt",
+    "http": "https://example.com/prefix/dir/file.txt",
+    "local": "/tmp/prefix/dir/file.txt",
+}
+
+
+def main():
+    for cls in (PurePath, Path):
+        for name, uri in URIS.items():
+            elapsed = timeit.timeit(lambda: cls(uri), number=NUMBER)
+            print(f"{cls.__name__:>8} {name:>5}: {elapsed / NUMBER * 1e9:8.0f} ns/path")
+
+
+if __name__ == "__main__":
+    main()
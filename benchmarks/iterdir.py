@@ -0,0 +1,27 @@
+import timeit
+
+from paaaaath import S3Path
+
+NUMBER = 5
+KEYS = [f"prefix/dir/{i:08d}.json" for i in range(100000)]
+
+
+def main():
+    parent = S3Path("s3://bucket/prefix/dir")
+    prefix = "prefix/dir/"
+
+    def from_uri():
+        for key in KEYS:
+            S3Path(f"{parent.anchor}/{key}")
+
+    def from_parent():
+        for key in KEYS:
+            parent._make_child_key(key[len(prefix) :])
+
+    for name, f in [("from uri", from_uri), ("from parent", from_parent)]:
+        elapsed = min(timeit.repeat(f, number=1, repeat=NUMBER))
+        print(f"{name:>12}: {len(KEYS) / elapsed:10.0f} objects/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import sys
+import tracemalloc
+
+from paaaaath import S3Path
+
+NUMBER = 1000000
+
+
+def measure(f):
+    tracemalloc.start()
+    paths = f()
+    for p in paths:
+        p.bucket, p.key
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current
+
+
+def main():
+    keys = [f"prefix/dir/{i:08d}.json" for i in range(NUMBER)]
+    parent = S3Path("s3://bucket/prefix/dir")
+
+    if "--listing" in sys.argv:
+        name = "listing"
+        current = measure(lambda: [parent._make_child_key(k[11:]) for k in keys])
+    else:
+        name = "uri"
+        current = measure(lambda: [S3Path(f"s3://bucket/{k}") for k in keys])
+    print(f"{name:>8}: {current / 2 ** 20:8.1f} MiB, {current / NUMBER:6.1f} B/path")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import timeit
+
+from paaaaath import PathArray, PurePath
+
+NUMBER = 100000
+URIS = [f"s3://bucket/prefix/{i % 100:02d}/{i:08d}.json" for i in range(NUMBER)]
+
+
+def main():
+    paths = [PurePath(uri) for uri in URIS]
+    array = PathArray(URIS)
+    base = PurePath("s3://bucket/prefix")
+
+    benchmarks = [
+        ("create", lambda: [PurePath(uri) for uri in URIS], lambda: PathArray(URIS)),
+        ("suffix", lambda: [p.suffix for p in paths], lambda: array.suffix),
+        ("stem", lambda: [p.stem for p in paths], lambda: array.stem),
+        ("parent", lambda: [p.parent for p in paths], lambda: array.parent),
+        (
+            "with_suffix",
+            lambda: [p.with_suffix(".csv") for p in paths],
+            lambda: array.with_suffix(".csv"),
+        ),
+        (
+            "relative_to",
+            lambda: [p.relative_to(base) for p in paths],
+            lambda: array.relative_to(base),
+        ),
+    ]
+    for name, per_path, bulk in benchmarks:
+        t_path = min(timeit.repeat(per_path, number=1, repeat=3))
+        t_array = min(timeit.repeat(bulk, number=1, repeat=3))
+        print(
+            f"{name:>12}: {t_path * 1e3:8.1f} ms (Path) {t_array * 1e3:8.1f} ms (PathArray)"
+        )
+
+
+if __name__ == "__main__":
+    main()
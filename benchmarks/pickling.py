@@ -0,0 +1,46 @@
+import pathlib
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from paaaaath import PathArray, PurePath, S3Path
+
+NUMBER = 1000000
+CHUNK_SIZE = 10000
+WORKERS = 4
+
+
+def count_json(paths):
+    return sum(1 for p in paths if p.suffix == ".json")
+
+
+def run(chunks):
+    beg = time.perf_counter()
+    with ProcessPoolExecutor(WORKERS) as executor:
+        count = sum(executor.map(count_json, chunks))
+    assert count == NUMBER
+    return time.perf_counter() - beg
+
+
+def main():
+    parent = S3Path("s3://bucket/prefix/dir")
+    paths = [
+        parent._make_child_key(f"{i % 100:02d}/{i:08d}.json") for i in range(NUMBER)
+    ]
+    chunks = [paths[i : i + CHUNK_SIZE] for i in range(0, NUMBER, CHUNK_SIZE)]
+    arrays = [PathArray(chunk) for chunk in chunks]
+
+    reduce = PurePath.__reduce__
+    PurePath.__reduce__ = pathlib.PurePath.__reduce__  # type: ignore
+    size = len(pickle.dumps(chunks[0])) / CHUNK_SIZE
+    print(f"pathlib reduce: {NUMBER / run(chunks):10.0f} paths/sec, {size:.1f} B/path")
+    PurePath.__reduce__ = reduce  # type: ignore
+
+    size = len(pickle.dumps(chunks[0])) / CHUNK_SIZE
+    print(f"  paaaaath list: {NUMBER / run(chunks):10.0f} paths/sec, {size:.1f} B/path")
+    size = len(pickle.dumps(arrays[0])) / CHUNK_SIZE
+    print(f"      PathArray: {NUMBER / run(arrays):10.0f} paths/sec, {size:.1f} B/path")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import os
+import random
+import time
+import uuid
+
+import boto3
+from paaaaath import S3Path, blockcache
+
+# Runs against the S3 compatible server the tests use
+ENDPOINT = os.environ.get("S3_API_ENDPOINT", "http://127.0.0.1:9000")
+SIZE = 32 << 20
+READS = 500
+READ_SIZE = 4096
+
+
+def footer(f):
+    # Parquet style: the length at the end, the footer before it, then columns
+    f.seek(-8, os.SEEK_END)
+    f.read(8)
+    f.seek(-(64 << 10), os.SEEK_END)
+    f.read(64 << 10)
+    for i in range(16):
+        f.seek(i * (SIZE // 16))
+        f.read(64 << 10)
+
+
+def scattered(f):
+    rng = random.Random(0)
+    for _ in range(READS):
+        f.seek(rng.randrange(SIZE - READ_SIZE))
+        f.read(READ_SIZE)
+
+
+def hot(f):
+    # Index lookups revisit a small set of pages
+    rng = random.Random(0)
+    pages = [rng.randrange(SIZE - READ_SIZE) for _ in range(32)]
+    for _ in range(READS):
+        f.seek(rng.choice(pages))
+        f.read(READ_SIZE)
+
+
+def main():
+    client = boto3.client("s3", endpoint_url=ENDPOINT)
+    bucket = f"bench-{uuid.uuid4().hex[:8]}"
+    client.create_bucket(Bucket=bucket)
+    client.put_object(Bucket=bucket, Key="blob", Body=os.urandom(SIZE))
+    S3Path.register_client(client)
+
+    requests = []
+    client.meta.events.register("before-call.s3", lambda model, **_: requests.append(1))
+
+    p = S3Path(f"s3://{bucket}/blob")
+    for name, pattern in [("footer", footer), ("scattered", scattered), ("hot", hot)]:
+        for cache in ["none", "block"]:
+            if cache == "block":
+                blockcache.enable_block_cache(256 << 10, 64 << 20, 64 << 20)
+            requests.clear()
+            beg = time.perf_counter()
+            with p.open("rb") as f:
+                pattern(f)
+            elapsed = time.perf_counter() - beg
+            blockcache.disable_block_cache()
+            print(
+                f"{name:>9} {cache:>5}: {len(requests):5d} requests, {elapsed:6.2f} sec"
+            )
+
+
+if __name__ == "__main__":
+    main()
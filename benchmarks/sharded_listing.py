@@ -0,0 +1,53 @@
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+from paaaaath import S3Path
+
+# Runs against the S3 compatible server the tests use, or a local minio
+ENDPOINT = os.environ.get("S3_API_ENDPOINT", "http://127.0.0.1:9000")
+KEYS = int(os.environ.get("BENCH_KEYS", "20000"))
+# Seconds added to every request, as a local server has no network latency
+LATENCY = float(os.environ.get("BENCH_LATENCY", "0"))
+
+
+def main():
+    client = boto3.client("s3", endpoint_url=ENDPOINT)
+    bucket = f"bench-{uuid.uuid4().hex[:8]}"
+    client.create_bucket(Bucket=bucket)
+    keys = [f"data/{uuid.uuid4().hex}.json" for _ in range(KEYS)]
+    with ThreadPoolExecutor(32) as executor:
+        list(executor.map(lambda k: client.put_object(Bucket=bucket, Key=k), keys))
+    S3Path.register_client(client)
+
+    requests = []
+
+    def _before_call(**_):
+        requests.append(1)
+        time.sleep(LATENCY)
+
+    client.meta.events.register("before-call.s3", _before_call)
+
+    p = S3Path(f"s3://{bucket}/data")
+    for max_workers, ordered in [
+        (1, True),
+        (4, True),
+        (8, True),
+        (8, False),
+        (16, False),
+    ]:
+        requests.clear()
+        beg = time.perf_counter()
+        n = sum(1 for _ in p.iterdir(max_workers=max_workers, ordered=ordered))
+        elapsed = time.perf_counter() - beg
+        mode = "ordered" if ordered else "unordered"
+        print(
+            f"{max_workers:2d} workers {mode:>9}: {n} keys, "
+            f"{len(requests):4d} requests, {elapsed:6.2f} sec"
+        )
+
+
+if __name__ == "__main__":
+    main()
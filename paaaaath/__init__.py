@@ -1,6 +1,8 @@
+from .bloom import ExistenceIndex
 from .common import Path, PurePath
 from .gcs import GCSPath, PureGCSPath
 from .http import HttpPath, PureHttpPath
+from .patharray import PathArray
 from .posix import PosixPath, PurePosixPath
 from .s3 import PureS3Path, S3Path
 from .uri import PureUriPath
@@ -16,10 +18,12 @@ __version__ = version(__name__)
 __all__ = [
     "Path",
     "PurePath",
+    "ExistenceIndex",
     "GCSPath",
     "PureGCSPath",
     "HttpPath",
     "PureHttpPath",
+    "PathArray",
     "PosixPath",
     "PurePosixPath",
     "PureS3Path",
@@ -1,4 +1,20 @@
-from paaaaath.common import PurePath, _SkeletonPath
+import io
+import math
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from os.path import commonprefix
+from stat import S_IFDIR, S_IFREG, S_ISDIR
+from typing import Any, Iterator, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from paaaaath import blockcache, contentcache, metacache, ranges, sharding
+from paaaaath.common import PurePath, _get_key, _make_path, _SkeletonPath
+
+# Groups of paths sharing a parent with at least this many members are
+# checked by listing the parent instead of probing every path.
+BULK_LIST_MIN_KEYS = 16
 
 
 def to_file_key(key: str) -> str:
@@ -9,6 +25,56 @@ def to_dir_key(key: str) -> str:
     return key if key.endswith("/") else f"{key}/"
 
 
+class BlobStat(NamedTuple):
+    st_mode: int
+    st_ino: int
+    st_dev: int
+    st_nlink: int
+    st_uid: int
+    st_gid: int
+    st_size: int
+    st_atime: float
+    st_mtime: float
+    st_ctime: float
+    etag: Optional[str] = None
+    version: Optional[str] = None
+
+
+def file_stat(
+    size: int, mtime: float, etag: Optional[str] = None, version: Optional[str] = None
+) -> BlobStat:
+    return BlobStat(
+        S_IFREG | 0o644, 0, 0, 1, 0, 0, size, mtime, mtime, mtime, etag, version
+    )
+
+
+def dir_stat(mtime: float = 0.0) -> BlobStat:
+    return BlobStat(S_IFDIR | 0o755, 0, 0, 1, 0, 0, 0, mtime, mtime, mtime)
+
+
+# Returned and listed for directories which may have no marker object.
+# Without implicit_dirs is_dir() disagrees with them, so they are neither
+# remembered nor cached then.
+_IMPLICIT_DIR = dir_stat()
+
+
+def _is_wildcard(part: str) -> bool:
+    return any(c in part for c in "*?[")
+
+
+def _match_parts(names: List[str], patterns: List[str], compile_pattern) -> bool:
+    if not patterns:
+        return not names
+    if patterns[0] == "**":
+        return any(
+            _match_parts(names[i:], patterns[1:], compile_pattern)
+            for i in range(len(names) + 1)
+        )
+    if not names or compile_pattern(patterns[0])(names[0]) is None:
+        return False
+    return _match_parts(names[1:], patterns[1:], compile_pattern)
+
+
 def _get_scheme(anchor: str) -> str:
     if ":" not in anchor:
         return ""
@@ -18,31 +84,869 @@ def _get_scheme(anchor: str) -> str:
 
 
 class PureBlobPath(PurePath):
+    # Before 3.10 pathlib.Path has its own slots, which would conflict with
+    # these ones in concrete blob paths, so fall back to __dict__ there.
+    if (3, 10) <= sys.version_info:
+        __slots__ = ("_bucket", "_key", "_stat_result", "_version")
+
+    # Query parameter of URIs which pins an object version
+    _version_query = ""
+
     @property
     def bucket(self):
+        try:
+            return self._bucket
+        except AttributeError:
+            self._bucket = self._get_bucket()
+            return self._bucket
+
+    @property
+    def key(self):
+        try:
+            return self._key
+        except AttributeError:
+            self._key = self._flavour.sep.join(self._parts[1:])
+            return self._key
+
+    def _get_bucket(self):
         if self.anchor == "":
             return ""
 
         beg = len(_get_scheme(self.anchor))
-        return self.anchor[beg:-1]
+        return sys.intern(self.anchor[beg:-1])
 
     @property
-    def key(self):
-        return self._flavour.sep.join(self.parts[1:])
+    def version(self) -> Optional[str]:
+        return getattr(self, "_version", None)
+
+    def at_version(self, version):
+        # An object version never changes, so everything known about the
+        # returned path can be cached for good.
+        if self.key == "":
+            raise ValueError(f"{self!r} has an empty key")
+
+        path = self._from_parsed_parts(self._drv, self._root, self._parts)
+        path._version = str(version)
+        return path
+
+    def _apply_query(self, uri):
+        versions = parse_qs(urlparse(uri).query).get(self._version_query)
+        if versions and self.key != "":
+            self._version = versions[-1]
+
+    def __reduce__(self):
+        if self.version is None:
+            return super().__reduce__()
+        key = _get_key(self)
+        return _make_pinned_path, (type(self), self._drv, self._root, key, self.version)
+
+    def __repr__(self):
+        if self.version is None:
+            return super().__repr__()
+        query = f"?{self._version_query}={self.version}"
+        return f"{self.__class__.__name__}({str(self) + query!r})"
+
+    def __eq__(self, other):
+        eq = super().__eq__(other)
+        if eq is not True:
+            return eq
+        return self.version == other.version
+
+    def __hash__(self):
+        if self.version is None:
+            return super().__hash__()
+        return hash((super().__hash__(), self.version))
+
+
+def _make_pinned_path(cls, drv, root, key, version):
+    return _make_path(cls, drv, root, key).at_version(version)
 
 
 class _SkeletonBlobPath(_SkeletonPath):
+    __slots__ = ()
     __client = None
 
     def _create_client(self):
         raise NotImplementedError("_create_client() must be implemented.")
 
+    # Existence indexes are shared by every blob path class, each of them
+    # only covers paths below its own prefix.
+    _existence_indexes: List[Any] = []
+
+    # Entries per listing response, None leaves it to the service
+    list_page_size: Optional[int] = None
+
+    # Seconds the metadata kept on a path, like the one from the listing
+    # which created it, is used before asking again. It never outlives the
+    # entries of the metadata cache.
+    stat_ttl = 5.0
+
+    # Treat every prefix followed by "/" as a directory instead of relying on
+    # zero-byte "key/" marker objects, which other tools rarely write.
+    implicit_dirs = False
+
+    # Names of finished subdirectories a top-down walk() holds before it
+    # lists the directory they are in to yield it early
+    walk_lookahead = 65536
+
+    # Provided by PureBlobPath
+    version: Optional[str]
+    # Expiry and metadata, see _get_stat_result()
+    _stat_result: Optional[Tuple[float, BlobStat]]
+
     @property
     def _client(self):
         if self.__client is None:
-            self.__client = self._create_client()
+            type(self).__client = self._create_client()
         return self.__client
 
     @classmethod
     def register_client(cls, client):
         cls.__client = client
+
+    def _make_child_key(self, key, stat_result=None):
+        # This is an optimization used for listing. `key` must be relative to
+        # this path, so the parsed parts of this path can be reused as is.
+        sep = self._flavour.sep
+        parts = [x for x in key.split(sep) if x and x != "."]
+        child = self._from_parsed_parts(self._drv, self._root, self._parts + parts)
+        if stat_result is not None and child._keeps(stat_result):
+            child._set_stat_result(stat_result)
+        return child
+
+    @staticmethod
+    def _seed(listed):
+        # Puts the (child, stat) pairs of a listing page into the metadata
+        # cache in one batch
+        cache = metacache._metadata_cache
+        if cache is not None and cache.seed_from_listings and listed:
+            cache.put_many(
+                (child._cache_key(), st)
+                for child, st in listed
+                if st is not None and child._keeps(st)
+            )
+
+    def iterdir(self, page_size=None, max_workers=1, ordered=True, boundaries=None):
+        key = to_dir_key(self.key) if self.key != "" else self.key
+        pages = self._list_sharded(key, page_size, max_workers, ordered, boundaries)
+        for entries in pages:
+            listed = [
+                (self._make_child_key(name[len(key) :], stat_result), stat_result)
+                for name, stat_result in entries
+                if name not in {".", "..", "", key}
+            ]
+            self._seed(listed)
+            for child, _ in listed:
+                yield child
+
+    def scandir(self, page_size=None, max_workers=1, ordered=True, boundaries=None):
+        for child in self.iterdir(page_size, max_workers, ordered, boundaries):
+            yield BlobDirEntry(child)
+
+    def _list_sharded(self, prefix, page_size, max_workers, ordered, boundaries):
+        # More than one worker lists the keyspace after a full first page in
+        # shards split at the given StartAfter boundaries, or at ones learned
+        # by sampling. A listing ending in a short page goes on serially.
+        pages = self._list_pages(prefix, page_size=page_size)
+        if max_workers <= 1 and boundaries is None:
+            yield from pages
+            return
+
+        first = sorted(next(pages, []), key=lambda e: e[0])
+        yield first
+        full = page_size or self.list_page_size or sharding.SERVICE_PAGE_SIZE
+        if len(first) < full:
+            yield from pages
+            return
+        pages.close()
+
+        if boundaries is None:
+
+            def first_key_after(start_after):
+                # Two entries as GCS may return start_after itself
+                pages = self._list_pages(prefix, start_after, page_size=2)
+                return min((name for name, _ in next(pages, [])), default=None)
+
+            shards = max(1, max_workers) * sharding.SHARDS_PER_WORKER
+            boundaries = sharding.sample_boundaries(
+                prefix, shards, first_key_after, max_workers=max_workers
+            )
+        yield from sharding.list_shards(
+            sorted(boundaries),
+            lambda start_after: self._list_pages(
+                prefix, start_after, page_size=page_size
+            ),
+            max_workers,
+            ordered,
+            start_after=first[-1][0],
+        )
+
+    def glob(self, pattern):
+        if not pattern:
+            raise ValueError(f"Unacceptable pattern: {pattern!r}")
+        if pattern.startswith("/"):
+            raise NotImplementedError("Non-relative patterns are unsupported")
+
+        parts = [x for x in pattern.split("/") if x and x != "."]
+        for part in parts:
+            if "**" in part and part != "**":
+                raise ValueError(
+                    "Invalid pattern: '**' can only be an entire path component"
+                )
+
+        # The literal leading components are not matched but listed below
+        n = next((i for i, x in enumerate(parts) if _is_wildcard(x)), len(parts))
+        base = self._make_child_key("/".join(parts[:n])) if 0 < n else self
+        if n == len(parts):
+            if base.exists():
+                yield base
+            return
+        yield from base._glob(parts[n:])
+
+    def rglob(self, pattern):
+        return self.glob(f"**/{pattern}")
+
+    def walk(self, top_down=True, on_error=None, follow_symlinks=False):
+        dir_key = to_dir_key(self.key) if self.key != "" else ""
+        walk = _TreeWalk(self, top_down, self.walk_lookahead)
+        for entries in self._list_pages(dir_key, delimiter=""):
+            for name, _ in entries:
+                yield from walk.add(name[len(dir_key) :])
+
+        if not walk.stack:
+            if self.key == "":
+                yield self, [], []
+            elif on_error is not None:
+                on_error(FileNotFoundError(f"No such file or directory: '{self}'"))
+            return
+        yield from walk.close()
+
+    def _glob(self, patterns):
+        # Lists the keys sharing the literal head of the first pattern, with
+        # a delimiter if only children can match and flat otherwise, so the
+        # requests made scale with the pages listed instead of directories.
+        compile_pattern = self._flavour.compile_pattern
+        dir_key = to_dir_key(self.key) if self.key != "" else ""
+        head = "" if patterns[0] == "**" else re.split(r"[*?[]", patterns[0], 1)[0]
+
+        if len(patterns) == 1 and patterns[0] != "**":
+            match = compile_pattern(patterns[0])
+            for entries in self._list_pages(dir_key + head):
+                listed = []
+                for name, stat_result in entries:
+                    child = name[len(dir_key) :].rstrip("/")
+                    if child != "" and match(child):
+                        listed.append(
+                            (self._make_child_key(child, stat_result), stat_result)
+                        )
+                self._seed(listed)
+                for child, _ in listed:
+                    yield child
+            return
+
+        # Directories are implied by the keys below them and yielded once
+        only_dirs = patterns[-1] == "**"
+        seen_dirs = {""}
+        if _match_parts([], patterns, compile_pattern):
+            # Only "**" matches this directory itself, if anything is below it
+            seen_dirs.remove("")
+        for entries in self._list_pages(dir_key + head, delimiter=""):
+            listed = []
+            for name, stat_result in entries:
+                names = name[len(dir_key) :].split("/")
+                is_marker = names[-1] == ""
+                if is_marker:
+                    names.pop()
+                for i in range(len(names) + 1):
+                    is_dir = i < len(names) or is_marker
+                    child = "/".join(names[:i])
+                    if is_dir:
+                        if child in seen_dirs:
+                            continue
+                        seen_dirs.add(child)
+                    elif only_dirs:
+                        continue
+                    if _match_parts(names[:i], patterns, compile_pattern):
+                        if i == len(names) and is_marker:
+                            child_stat = dir_stat(stat_result.st_mtime)
+                        elif is_dir:
+                            child_stat = _IMPLICIT_DIR
+                        else:
+                            child_stat = stat_result
+                        listed.append(
+                            (self._make_child_key(child, child_stat), child_stat)
+                        )
+            self._seed(listed)
+            for child, _ in listed:
+                yield child
+
+    def _head(self, key, version=None) -> Optional[BlobStat]:
+        raise NotImplementedError("_head() must be implemented.")
+
+    def _exists(self, key) -> bool:
+        raise NotImplementedError("_exists() must be implemented.")
+
+    def _check_parent(self):
+        if not self.implicit_dirs and not self._exists(to_dir_key(self.parent.key)):
+            raise FileNotFoundError(f"No such file or directory: '{self.parent}'")
+
+    def _list(self, prefix, max_keys) -> Tuple[List[Tuple[str, BlobStat]], bool]:
+        # Returns up to `max_keys` keys starting with `prefix` together with
+        # their metadata, and whether more keys follow them. Raises
+        # PermissionError if listing is denied.
+        raise NotImplementedError("_list() must be implemented.")
+
+    def _list_pages(
+        self, prefix, start_after="", delimiter="/", page_size=None
+    ) -> Iterator[List[Tuple[str, BlobStat]]]:
+        # Yields one list per response holding the keys and the common
+        # prefixes right below `prefix` which sort after `start_after`.
+        # Without a delimiter every key under `prefix` is listed. Responses
+        # hold `page_size` entries at most, or list_page_size if not given.
+        raise NotImplementedError("_list_pages() must be implemented.")
+
+    def _download(self, key, stat_result: BlobStat, f) -> None:
+        # Writes the object at the version or ETag of `stat_result` to `f`.
+        # Raises FileNotFoundError once the object has changed since.
+        raise NotImplementedError("_download() must be implemented.")
+
+    def _get_range(self, key, start, end, stat_result=None) -> bytes:
+        # Returns bytes from `start` up to `end` of the object, or fewer past
+        # its end. Like _download(), it is pinned to `stat_result` if given
+        # and to the version of this path otherwise.
+        raise NotImplementedError("_get_range() must be implemented.")
+
+    def _probe(self, key) -> Tuple[Optional[BlobStat], int]:
+        # Finds a file, a directory marker or an implicit directory with one
+        # listing. Keys are sorted bytewise, so `key` itself comes first and
+        # only siblings like "key.txt" can precede the keys under "key/".
+        # The number of requests made is returned along with the result.
+        if self.version is not None:
+            return self._head(key, self.version), 1
+
+        dir_key = to_dir_key(key)
+        try:
+            entries, truncated = self._list(key, 2)
+        except PermissionError:
+            # Objects may be readable where listing them is denied
+            return self._probe_by_head(key)
+        for name, stat_result in entries:
+            if name == key:
+                return stat_result, 1
+            if name == dir_key:
+                return dir_stat(stat_result.st_mtime), 1
+            if name.startswith(dir_key):
+                return _IMPLICIT_DIR, 1
+        if not truncated:
+            return None, 1
+
+        entries, _ = self._list(dir_key, 1)
+        for name, stat_result in entries:
+            if name == dir_key:
+                return dir_stat(stat_result.st_mtime), 2
+            return _IMPLICIT_DIR, 2
+        return None, 2
+
+    def _probe_by_head(self, key) -> Tuple[Optional[BlobStat], int]:
+        stat_result = self._head(key)
+        if stat_result is not None:
+            return stat_result, 1
+        stat_result = self._head(to_dir_key(key))
+        if stat_result is None:
+            return None, 2
+        return dir_stat(stat_result.st_mtime), 2
+
+    @classmethod
+    def _stat_many(cls, paths, counters, max_workers):
+        groups = {}
+        sparse = []
+        for p in paths:
+            if p.key == "":
+                yield p, dir_stat()
+                continue
+            known, stat_result = p._known_stat()
+            if known:
+                yield p, stat_result
+                continue
+            if p.version is not None:
+                sparse.append(p)
+                continue
+            groups.setdefault((p.bucket, p.key.rpartition("/")[0]), []).append(p)
+
+        for group in groups.values():
+            if len(group) < BULK_LIST_MIN_KEYS:
+                sparse.extend(group)
+            else:
+                sparse.extend((yield from cls._stat_by_listing(group, counters)))
+
+        if not sparse:
+            return
+        with ThreadPoolExecutor(max_workers) as executor:
+            futures = {executor.submit(p._probe, to_file_key(p.key)): p for p in sparse}
+            for future in as_completed(futures):
+                stat_result, requests = future.result()
+                counters["probe"] = counters.get("probe", 0) + requests
+                p = futures[future]
+                p._remember(stat_result)
+                yield p, stat_result
+
+    @classmethod
+    def _stat_by_listing(cls, paths, counters):
+        # Walks the listing of the shared parent across the range of the
+        # wanted keys. Once the pages issued outnumber the keys still ahead,
+        # probing them is cheaper, so they are returned to the caller.
+        by_key = {}
+        for p in paths:
+            by_key.setdefault(to_file_key(p.key), []).append(p)
+        keys = sorted(by_key)
+
+        found = {}
+        pages = paths[0]._list_pages(commonprefix(keys), keys[0][:-1])
+        i = 0
+        requests = 0
+        try:
+            for entries in pages:
+                requests += 1
+                last = ""
+                for name, stat_result in entries:
+                    last = max(last, name)
+                    if name in by_key:
+                        found[name] = stat_result
+                    elif name.endswith("/") and name[:-1] in by_key:
+                        found.setdefault(name[:-1], _IMPLICIT_DIR)
+
+                while i < len(keys) and to_dir_key(keys[i]) <= last:
+                    yield from cls._set_stat_results(by_key[keys[i]], found)
+                    i += 1
+                if len(keys) - i <= requests:
+                    break
+            else:
+                for key in keys[i:]:
+                    yield from cls._set_stat_results(by_key[key], found)
+                i = len(keys)
+        finally:
+            counters["list"] = counters.get("list", 0) + requests
+        return [p for key in keys[i:] for p in by_key[key]]
+
+    @staticmethod
+    def _set_stat_results(paths, found):
+        for p in paths:
+            stat_result = found.get(to_file_key(p.key))
+            p._remember(stat_result)
+            yield p, stat_result
+
+    def _get_stat_result(self) -> Optional[BlobStat]:
+        memo = getattr(self, "_stat_result", None)
+        if memo is None:
+            return None
+        expires, stat_result = memo
+        if expires <= time.monotonic():
+            self._stat_result = None
+            return None
+        return stat_result
+
+    def _set_stat_result(self, stat_result: Optional[BlobStat]) -> None:
+        if stat_result is None:
+            self._stat_result = None
+            return
+
+        ttl = self.stat_ttl
+        if self.version is not None:
+            # Versions are immutable
+            ttl = math.inf
+        elif metacache._metadata_cache is not None:
+            ttl = min(ttl, metacache._metadata_cache.ttl)
+        self._stat_result = (time.monotonic() + ttl, stat_result)
+
+    def _cache_key(self):
+        if self.version is None:
+            return self._drv, to_file_key(self.key)
+        query = f"?{self._version_query}={self.version}"
+        return self._drv, to_file_key(self.key) + query
+
+    def _known_stat(self) -> Tuple[bool, Optional[BlobStat]]:
+        # Returns whether the metadata is known without a request, from this
+        # path, an existence index or the metadata cache, and the stat
+        # result, which is None for paths known to be missing.
+        stat_result = self._get_stat_result()
+        if stat_result is not None:
+            return True, stat_result
+        if self.version is None and self._ruled_out():
+            return True, None
+        cache = metacache._metadata_cache
+        if cache is None:
+            return False, None
+        return cache.get(self._cache_key())
+
+    def _keeps(self, stat_result: BlobStat) -> bool:
+        return stat_result is not _IMPLICIT_DIR or self.implicit_dirs
+
+    def _remember(self, stat_result: Optional[BlobStat]) -> None:
+        if stat_result is not None and not self._keeps(stat_result):
+            return
+        self._set_stat_result(stat_result)
+        cache = metacache._metadata_cache
+        if cache is not None:
+            # Versions are immutable, but may still be created or deleted
+            pinned = self.version is not None and stat_result is not None
+            cache.put(self._cache_key(), stat_result, math.inf if pinned else None)
+
+    def _before_write(self, mode="w"):
+        if "r" not in mode or "+" in mode:
+            if self.version is not None:
+                raise ValueError(f"{self!r} is pinned to a version and read-only")
+
+            self._stat_result = None
+            for index in self._existence_indexes:
+                if index.covers(self):
+                    index.add(self)
+
+            # A write may also create the parents as implicit directories
+            cache = metacache._metadata_cache
+            if cache is not None:
+                key = to_file_key(self.key)
+                while key != "":
+                    cache.invalidate((self._drv, key))
+                    key = key.rpartition("/")[0]
+
+    def _forget(self) -> None:
+        self._stat_result = None
+        if metacache._metadata_cache is not None:
+            metacache._metadata_cache.invalidate(self._cache_key())
+
+    def _open_cached(self, args, kwargs):
+        # Opens reads through the content or block cache, None if neither
+        # applies
+        mode = args[0] if args else kwargs.get("mode", "r")
+        if "r" not in mode or "+" in mode:
+            return None
+
+        f = None
+        if contentcache._content_cache is not None:
+            f = self._open_content(contentcache._content_cache, args, kwargs)
+        if f is None and blockcache._block_cache is not None:
+            f = self._open_blocks(args, kwargs)
+        return f
+
+    def _open_content(self, cache, args, kwargs):
+        if self.version is not None:
+            # A cached copy of a version is always valid
+            path = cache.get((self._drv, self.key, self.version))
+            if path is not None:
+                return self._open_local(path, args, kwargs)
+
+        # The download is pinned to the ETag of the remembered stat result,
+        # and fails if that is stale. A fresh one is then tried once more.
+        for _ in range(2):
+            stat_result = self.stat()
+            tag = stat_result.version or stat_result.etag
+            if S_ISDIR(stat_result.st_mode) or tag is None:
+                return None
+            if cache.max_bytes < stat_result.st_size:
+                return None
+
+            key = (self._drv, self.key, tag)
+            try:
+                path = cache.get(key)
+                if path is None:
+                    path = cache.put(
+                        key, lambda f: self._download(self.key, stat_result, f)
+                    )
+                return self._open_local(path, args, kwargs)
+            except FileNotFoundError:
+                # The object changed or another process evicted the entry
+                self._forget()
+        return None
+
+    def _open_local(self, path, args, kwargs):
+        from smart_open import smart_open_lib
+
+        raw = io.FileIO(path)
+        # smart_open infers the compression from the name, not the cache file's
+        raw.name = str(self)
+        return smart_open_lib.open(io.BufferedReader(raw), *args, **kwargs)
+
+    def _open_blocks(self, args, kwargs):
+        from smart_open import smart_open_lib
+
+        stat_result = self.stat()
+        if S_ISDIR(stat_result.st_mode):
+            return None
+
+        raw = blockcache.BlockReader(str(self), stat_result.st_size, self.read_range)
+        return smart_open_lib.open(io.BufferedReader(raw), *args, **kwargs)
+
+    @classmethod
+    def register_existence_index(cls, index) -> None:
+        cls._existence_indexes.append(index)
+
+    @classmethod
+    def unregister_existence_index(cls, index) -> None:
+        cls._existence_indexes.remove(index)
+
+    def _ruled_out(self) -> bool:
+        return any(
+            index.covers(self) and self not in index
+            for index in self._existence_indexes
+        )
+
+    def stat(self):
+        if self.key == "":
+            return dir_stat()
+
+        known, stat_result = self._known_stat()
+        if not known:
+            stat_result, _ = self._probe(to_file_key(self.key))
+            self._remember(stat_result)
+        if stat_result is None:
+            raise FileNotFoundError(f"No such file or directory: '{self}'")
+        return stat_result
+
+    def exists(self):
+        try:
+            self.stat()
+        except FileNotFoundError:
+            return False
+        return True
+
+    def is_file(self):
+        if self.key == "":
+            return False
+
+        known, stat_result = self._known_stat()
+        if not known:
+            stat_result = self._head(to_file_key(self.key), self.version)
+            if stat_result is not None:
+                self._remember(stat_result)
+        return stat_result is not None and not S_ISDIR(stat_result.st_mode)
+
+    def is_dir(self):
+        if self.key == "":
+            return True
+        if self.version is not None:
+            return False
+
+        known, stat_result = self._known_stat()
+        if known:
+            return stat_result is not None and S_ISDIR(stat_result.st_mode)
+
+        if self.implicit_dirs:
+            entries, _ = self._list(to_dir_key(self.key), 1)
+            if not entries:
+                return False
+            self._remember(dir_stat())
+            return True
+
+        stat_result = self._head(to_dir_key(self.key))
+        if stat_result is None or stat_result.st_size != 0:
+            return False
+        self._remember(dir_stat(stat_result.st_mtime))
+        return True
+
+    def read_range(self, offset, length):
+        if offset < 0 or length < 0:
+            raise ValueError(f"invalid range. offset={offset}, length={length}")
+        if length == 0:
+            return b""
+
+        cache = blockcache._block_cache
+        if cache is None:
+            return self._get_range(self.key, offset, offset + length)
+
+        for retry in [True, False]:
+            stat_result = self.stat()
+            if S_ISDIR(stat_result.st_mode):
+                raise IsADirectoryError(f"Is a directory: '{self}'")
+
+            def _fetch(start, end):
+                return self._get_range(self.key, start, end, stat_result)
+
+            tag = stat_result.version or stat_result.etag or ""
+            path_key = (self._drv, self.key, tag)
+            try:
+                return cache.read(path_key, stat_result.st_size, offset, length, _fetch)
+            except FileNotFoundError:
+                # The object may have changed since its metadata was known
+                if not retry or self.version is not None:
+                    raise
+                self._forget()
+
+    def read_ranges(
+        self,
+        offsets_and_lengths,
+        *,
+        max_gap=ranges.DEFAULT_MAX_GAP,
+        max_size=ranges.DEFAULT_MAX_RANGE_SIZE,
+        max_workers=ranges.DEFAULT_MAX_WORKERS,
+    ):
+        # Known metadata pins every request to the same object version
+        stat_result = self._get_stat_result()
+
+        def _fetch(start, end):
+            return self._get_range(self.key, start, end, stat_result)
+
+        return ranges.read_ranges(
+            offsets_and_lengths, _fetch, max_gap, max_size, max_workers
+        )
+
+
+class BlobDirEntry:
+    # os.DirEntry look-alike whose metadata comes from the listing
+    __slots__ = ("_path", "name", "path")
+
+    def __init__(self, path: _SkeletonBlobPath):
+        self._path = path
+        self.name = path.name
+        self.path = str(path)
+
+    def __fspath__(self):
+        return self.path
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self.name!r}>"
+
+    def inode(self):
+        return 0
+
+    def is_dir(self, *, follow_symlinks=True):
+        return self._path.is_dir()
+
+    def is_file(self, *, follow_symlinks=True):
+        return self._path.is_file()
+
+    def is_symlink(self):
+        return False
+
+    def stat(self, *, follow_symlinks=True):
+        return self._path.stat()
+
+
+class _WalkDir:
+    # A directory in a walk, with its finished subdirectories while they wait
+    # for it to be yielded top-down. Pruned ones are skipped by the caller.
+    __slots__ = (
+        "path",
+        "dirnames",
+        "filenames",
+        "children",
+        "size",
+        "yielded",
+        "pruned",
+    )
+
+    def __init__(self, path, pruned: bool = False):
+        self.path = path
+        self.dirnames: List[str] = []
+        self.filenames: List[str] = []
+        self.children: List["_WalkDir"] = []
+        self.size = 0
+        self.yielded = False
+        self.pruned = pruned
+
+
+class _TreeWalk:
+    # Rebuilds the tree from one flat listing. Keys under a directory are
+    # contiguous in it, so a directory is finished once a key outside it
+    # follows. Bottom-up yields it right then and only holds the open
+    # directories. Top-down has to yield it before its subdirectories, which
+    # finish first and are held until it does. Once they hold more than
+    # lookahead names, the outermost open directory not yielded yet is listed
+    # with a delimiter for its names and yielded early, and its subdirectories
+    # follow as they finish.
+    def __init__(self, root, top_down: bool, lookahead: int):
+        self.root = root
+        self.top_down = top_down
+        self.lookahead = lookahead
+        self.stack: List[_WalkDir] = []
+        self.held = 0
+
+    def add(self, relkey: str):
+        if not self.stack:
+            self.stack.append(_WalkDir(self.root))
+
+        names = relkey.split("/")
+        filename = names.pop()
+        common = 0
+        while common < min(len(names), len(self.stack) - 1):
+            if self.stack[common + 1].path.name != names[common]:
+                break
+            common += 1
+        while common + 1 < len(self.stack):
+            yield from self._close_last()
+
+        for dirname in names[common:]:
+            parent = self.stack[-1]
+            if parent.yielded:
+                # Like os.walk, dirnames removed by the caller are skipped
+                pruned = dirname not in parent.dirnames
+            else:
+                pruned = parent.pruned
+                if not pruned:
+                    parent.dirnames.append(dirname)
+            child = _WalkDir(parent.path._make_child_key(dirname), pruned)
+            self.stack.append(child)
+        record = self.stack[-1]
+        if filename != "" and not (record.yielded or record.pruned):
+            record.filenames.append(filename)
+
+        while self.top_down and self.lookahead < self.held:
+            yield from self._yield_early()
+
+    def close(self):
+        while self.stack:
+            yield from self._close_last()
+
+    def _close_last(self):
+        record = self.stack.pop()
+        if not self.top_down:
+            yield record.path, record.dirnames, record.filenames
+        elif record.pruned or record.yielded:
+            return
+        elif self.stack and not self.stack[-1].yielded:
+            record.size = 1 + len(record.dirnames) + len(record.filenames)
+            self.stack[-1].children.append(record)
+            self.held += record.size
+        else:
+            yield from self._yield_tree(record)
+
+    def _yield_tree(self, record):
+        record.yielded = True
+        yield record.path, record.dirnames, record.filenames
+        kept = set(record.dirnames)
+        children, record.children = record.children, []
+        for child in children:
+            self.held -= child.size
+            if child.path.name in kept:
+                yield from self._yield_tree(child)
+            else:
+                self._drop(child)
+
+    def _drop(self, record):
+        for child in record.children:
+            self.held -= child.size
+            self._drop(child)
+        record.children = []
+
+    def _yield_early(self):
+        i = next(i for i, r in enumerate(self.stack) if not r.yielded)
+        record = self.stack[i]
+        path = record.path
+        dir_key = to_dir_key(path.key) if path.key != "" else ""
+        record.dirnames, record.filenames = [], []
+        for entries in path._list_pages(dir_key):
+            for name, _ in entries:
+                name = name[len(dir_key) :]
+                if name.endswith("/"):
+                    record.dirnames.append(name[:-1])
+                elif name != "":
+                    record.filenames.append(name)
+        yield from self._yield_tree(record)
+
+        # The open subdirectory is skipped with everything below it if the
+        # caller removed it
+        if i + 1 < len(self.stack):
+            if self.stack[i + 1].path.name not in record.dirnames:
+                for r in self.stack[i + 1 :]:
+                    self._drop(r)
+                    r.dirnames, r.filenames = [], []
+                    r.pruned = True
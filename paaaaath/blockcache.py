@@ -0,0 +1,214 @@
+import io
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+DEFAULT_BLOCK_SIZE = 1 << 20
+DEFAULT_BLOCK_CACHE_BYTES = 256 << 20
+DEFAULT_BLOCK_CACHE_BYTES_PER_PATH = 64 << 20
+
+# Drive, key and the version or ETag of the object
+_PathKey = Tuple[str, str, str]
+
+
+class BlockCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    max_bytes: int
+    currbytes: int
+
+
+class BlockCache:
+    # Fixed-size blocks of blob objects for random-access reads. Blocks are
+    # evicted least recently used first, from the same object once it holds
+    # more than max_bytes_per_path and from any object beyond max_bytes.
+    def __init__(
+        self,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        max_bytes: int = DEFAULT_BLOCK_CACHE_BYTES,
+        max_bytes_per_path: int = DEFAULT_BLOCK_CACHE_BYTES_PER_PATH,
+    ):
+        for name, value in [
+            ("block_size", block_size),
+            ("max_bytes", max_bytes),
+            ("max_bytes_per_path", max_bytes_per_path),
+        ]:
+            if value <= 0:
+                raise ValueError(f"{name} must be positive. but {value} was given.")
+
+        self.block_size = block_size
+        self.max_bytes = max_bytes
+        self.max_bytes_per_path = max_bytes_per_path
+        self._blocks: "OrderedDict[Tuple[_PathKey, int], bytes]" = OrderedDict()
+        self._path_blocks: Dict[_PathKey, "OrderedDict[int, None]"] = {}
+        self._path_bytes: Dict[_PathKey, int] = {}
+        self._currbytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def read(
+        self,
+        path_key: _PathKey,
+        size: int,
+        offset: int,
+        length: int,
+        fetch: Callable[[int, int], bytes],
+    ) -> bytes:
+        # Reads `length` bytes at `offset` of an object of `size` bytes.
+        # Missing blocks are fetched with fetch(start, end), one call per run
+        # of adjacent missing blocks.
+        end = min(size, offset + length)
+        if end <= offset:
+            return b""
+
+        bs = self.block_size
+        indices = range(offset // bs, (end - 1) // bs + 1)
+        blocks = {}
+        missing = []
+        with self._lock:
+            for i in indices:
+                block = self._blocks.get((path_key, i))
+                if block is None:
+                    missing.append(i)
+                    continue
+                self._touch(path_key, i)
+                blocks[i] = block
+            self._hits += len(blocks)
+            self._misses += len(missing)
+
+        for first, last in _runs(missing):
+            data = fetch(first * bs, min(size, (last + 1) * bs))
+            for i in range(first, last + 1):
+                blocks[i] = data[(i - first) * bs : (i - first + 1) * bs]
+                self._put(path_key, i, blocks[i])
+
+        data = b"".join(blocks[i] for i in indices)
+        beg = offset - indices[0] * bs
+        return data[beg : beg + end - offset]
+
+    def _touch(self, path_key: _PathKey, i: int) -> None:
+        self._blocks.move_to_end((path_key, i))
+        self._path_blocks[path_key].move_to_end(i)
+
+    def _put(self, path_key: _PathKey, i: int, block: bytes) -> None:
+        if self.max_bytes_per_path < len(block) or self.max_bytes < len(block):
+            return
+
+        with self._lock:
+            if (path_key, i) in self._blocks:
+                self._touch(path_key, i)
+                return
+
+            self._blocks[(path_key, i)] = block
+            self._path_blocks.setdefault(path_key, OrderedDict())[i] = None
+            self._path_bytes[path_key] = self._path_bytes.get(path_key, 0) + len(block)
+            self._currbytes += len(block)
+            while self.max_bytes_per_path < self._path_bytes[path_key]:
+                self._evict(path_key, next(iter(self._path_blocks[path_key])))
+            while self.max_bytes < self._currbytes:
+                self._evict(*next(iter(self._blocks)))
+
+    def _evict(self, path_key: _PathKey, i: int) -> None:
+        block = self._blocks.pop((path_key, i))
+        del self._path_blocks[path_key][i]
+        self._path_bytes[path_key] -= len(block)
+        if not self._path_blocks[path_key]:
+            del self._path_blocks[path_key]
+            del self._path_bytes[path_key]
+        self._currbytes -= len(block)
+        self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._blocks.clear()
+            self._path_blocks.clear()
+            self._path_bytes.clear()
+            self._currbytes = 0
+
+    def info(self) -> BlockCacheInfo:
+        with self._lock:
+            return BlockCacheInfo(
+                self._hits,
+                self._misses,
+                self._evictions,
+                self.max_bytes,
+                self._currbytes,
+            )
+
+
+def _runs(indices: List[int]) -> List[Tuple[int, int]]:
+    runs: List[Tuple[int, int]] = []
+    for i in indices:
+        if runs and runs[-1][1] + 1 == i:
+            runs[-1] = (runs[-1][0], i)
+        else:
+            runs.append((i, i))
+    return runs
+
+
+class BlockReader(io.RawIOBase):
+    # Seekable binary stream whose reads go through read_range(offset, length)
+    def __init__(self, name: str, size: int, read_range: Callable[[int, int], bytes]):
+        self.name = name
+        self._size = size
+        self._read_range = read_range
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self._size
+        elif whence != io.SEEK_SET:
+            raise ValueError(f"invalid whence ({whence}, should be 0, 1 or 2)")
+        if offset < 0:
+            raise ValueError(f"negative seek position {offset}")
+        self._pos = offset
+        return self._pos
+
+    def readinto(self, b) -> int:
+        data = self._read_range(self._pos, len(b))
+        b[: len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+    def readall(self) -> bytes:
+        data = self._read_range(self._pos, max(0, self._size - self._pos))
+        self._pos += len(data)
+        return data
+
+
+# Shared by S3Path and GCSPath, installed by enable_block_cache()
+_block_cache: Optional[BlockCache] = None
+
+
+def enable_block_cache(
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    max_bytes: int = DEFAULT_BLOCK_CACHE_BYTES,
+    max_bytes_per_path: int = DEFAULT_BLOCK_CACHE_BYTES_PER_PATH,
+) -> None:
+    global _block_cache
+    _block_cache = BlockCache(block_size, max_bytes, max_bytes_per_path)
+
+
+def disable_block_cache() -> None:
+    global _block_cache
+    _block_cache = None
+
+
+def block_cache_info() -> Optional[BlockCacheInfo]:
+    if _block_cache is None:
+        return None
+    return _block_cache.info()
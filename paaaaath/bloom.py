@@ -0,0 +1,211 @@
+import json
+import math
+from hashlib import blake2b
+from typing import BinaryIO, Iterable, List, Optional
+
+from paaaaath.blob import _SkeletonBlobPath, to_dir_key, to_file_key
+from paaaaath.common import Path
+
+_MAGIC_V1 = b"PAAAAATH-BLOOM-1\n"
+_MAGIC = b"PAAAAATH-BLOOM-2\n"
+
+# Keys the first filter built for a prefix is sized for
+DEFAULT_INITIAL_CAPACITY = 4096
+# Each filter added to a full index has twice the capacity and this share of
+# the error rate of the previous one, which bounds the sum of their rates.
+_GROWTH = 2
+_TIGHTENING = 0.5
+
+
+class BloomFilter:
+    # Bits are addressed by double hashing one blake2b digest, which is
+    # stable across processes unlike hash().
+    __slots__ = (
+        "capacity",
+        "max_error_rate",
+        "num_bits",
+        "num_hashes",
+        "count",
+        "_bits",
+    )
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        if not 0.0 < error_rate < 1.0:
+            raise ValueError(f"error_rate must be in (0, 1), not {error_rate!r}")
+
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.max_error_rate = error_rate
+        num_bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.num_bits = max(num_bits, 8)
+        self.num_hashes = max(round(self.num_bits / capacity * math.log(2)), 1)
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _indexes(self, item: str):
+        digest = blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str) -> None:
+        for i in self._indexes(item):
+            self._bits[i >> 3] |= 1 << (i & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[i >> 3] & (1 << (i & 7)) for i in self._indexes(item))
+
+    @property
+    def error_rate(self) -> float:
+        # Expected false positive rate for the items added so far
+        k, m = self.num_hashes, self.num_bits
+        return (1.0 - math.exp(-k * self.count / m)) ** k
+
+    @property
+    def full(self) -> bool:
+        return self.capacity <= self.count
+
+    def _grown(self) -> "BloomFilter":
+        error_rate = self.max_error_rate * _TIGHTENING
+        return BloomFilter(self.capacity * _GROWTH, error_rate)
+
+
+class ExistenceIndex:
+    # Bloom filters over the keys below a prefix and over the directories
+    # holding them. A path they do not contain surely does not exist, any
+    # other path still has to be checked against the bucket. Once a filter
+    # holds as many keys as it was sized for, a larger one with a tighter
+    # error rate takes the new keys, so the false positive rate of the index
+    # stays below twice the rate of its first filter however it grows.
+    __slots__ = ("prefix", "_filters")
+
+    def __init__(self, prefix, bloom_filter: BloomFilter):
+        self.prefix = prefix
+        self._filters: List[BloomFilter] = [bloom_filter]
+
+    @classmethod
+    def build(
+        cls,
+        prefix,
+        error_rate: float = 0.01,
+        initial_capacity: int = DEFAULT_INITIAL_CAPACITY,
+    ) -> "ExistenceIndex":
+        # Keys are added as the listing streams in, so memory follows the
+        # filters, not the number of keys
+        prefix = _as_blob_path(prefix)
+        self = cls(prefix, BloomFilter(initial_capacity, error_rate * _TIGHTENING))
+        self.update()
+        return self
+
+    def update(self, paths: Optional[Iterable] = None) -> None:
+        # Adds the given paths, or everything a fresh listing of the prefix
+        # returns. Keys are never removed from a Bloom filter.
+        if paths is None:
+            keys: Iterable[str] = _list_keys(self.prefix)
+        else:
+            keys = (to_file_key(_as_blob_path(p).key) for p in paths)
+        for key in keys:
+            for k in _with_parents(key, self.prefix.key):
+                self._add(k)
+
+    def _add(self, key: str) -> None:
+        # Keys already contained are skipped, so parents shared by many keys
+        # and keys listed again do not use up the capacity
+        if self._contains(key):
+            return
+        if self._filters[-1].full:
+            self._filters.append(self._filters[-1]._grown())
+        self._filters[-1].add(key)
+
+    def _contains(self, key: str) -> bool:
+        return any(key in f for f in self._filters)
+
+    def add(self, path) -> None:
+        self.update([path])
+
+    def covers(self, path) -> bool:
+        if type(path) is not type(self.prefix) or path.bucket != self.prefix.bucket:
+            return False
+        prefix_key = self.prefix.key
+        if prefix_key == "":
+            return path.key != ""
+        return path.key.startswith(to_dir_key(prefix_key))
+
+    def __contains__(self, path) -> bool:
+        return self._contains(to_file_key(path.key))
+
+    @property
+    def error_rate(self) -> float:
+        # Expected false positive rate of all filters together
+        passes = 1.0
+        for f in self._filters:
+            passes *= 1.0 - f.error_rate
+        return 1.0 - passes
+
+    def save(self, f: BinaryIO) -> None:
+        header = {
+            "prefix": str(self.prefix),
+            "filters": [
+                {
+                    "capacity": b.capacity,
+                    "max_error_rate": b.max_error_rate,
+                    "num_bits": b.num_bits,
+                    "num_hashes": b.num_hashes,
+                    "count": b.count,
+                }
+                for b in self._filters
+            ],
+        }
+        f.write(_MAGIC)
+        f.write(json.dumps(header).encode("utf-8") + b"\n")
+        for b in self._filters:
+            f.write(b._bits)
+
+    @classmethod
+    def load(cls, f: BinaryIO) -> "ExistenceIndex":
+        magic = f.readline()
+        if magic not in {_MAGIC, _MAGIC_V1}:
+            raise ValueError("not an existence index")
+        header = json.loads(f.readline())
+
+        if magic == _MAGIC_V1:
+            # A single filter saved without its sizing is taken as full
+            header["filters"] = [header]
+        filters = []
+        for h in header["filters"]:
+            b = BloomFilter.__new__(BloomFilter)
+            b.num_bits = h["num_bits"]
+            b.num_hashes = h["num_hashes"]
+            b.count = h["count"]
+            b.capacity = h.get("capacity", b.count)
+            b.max_error_rate = h.get("max_error_rate") or b.error_rate or 0.01
+            b._bits = bytearray(f.read((b.num_bits + 7) // 8))
+            filters.append(b)
+
+        self = cls(_as_blob_path(header["prefix"]), filters[0])
+        self._filters = filters
+        return self
+
+
+def _as_blob_path(path):
+    if not isinstance(path, _SkeletonBlobPath):
+        path = Path(path)
+    if not isinstance(path, _SkeletonBlobPath):
+        raise ValueError(f"{str(path)!r} is not a blob path")
+    return path
+
+
+def _list_keys(prefix):
+    key = to_dir_key(prefix.key) if prefix.key != "" else ""
+    for entries in prefix._list_pages(key, delimiter=""):
+        for name, _ in entries:
+            yield to_file_key(name)
+
+
+def _with_parents(key: str, prefix_key: str):
+    # A key makes every directory between it and the prefix exist as well
+    while key != "" and key != prefix_key:
+        yield key
+        key = key.rpartition("/")[0]
@@ -2,7 +2,8 @@ import os
 import pathlib
 import sys
 from dataclasses import dataclass
-from typing import Any, Callable, List, Type, cast
+from importlib.util import find_spec
+from typing import Any, Callable, Dict, List, Type, cast
 
 
 @dataclass
@@ -11,29 +12,96 @@ class RegisteredPurePathClass:
     cls: Type["PurePath"]
 
 
+def _has_module(name: str) -> bool:
+    try:
+        return find_spec(name) is not None
+    except ImportError:
+        return False
+
+
+def _make_path(cls: Type["PurePath"], drv: str, root: str, key: str) -> "PurePath":
+    anchor = drv + root
+    parts = [sys.intern(anchor)] if anchor else []
+    if key != "":
+        parts += key.split("/")
+    return cls._from_parsed_parts(sys.intern(drv), root, parts)  # type: ignore
+
+
+def _get_key(path: "PurePath") -> str:
+    parts = path._parts  # type: ignore
+    return "/".join(parts[1:] if path._drv or path._root else parts)  # type: ignore
+
+
+def _parse_uri_args(args):
+    from paaaaath.uri import PureUriPath
+
+    return PureUriPath._parse_args(args)  # type: ignore
+
+
+def _drive_scheme(drv: str) -> str:
+    return drv[: drv.find("://")]
+
+
 class PurePath(pathlib.PurePath):
+    __slots__ = ()
     _uri_cls_repository: List[RegisteredPurePathClass] = []
+    _uri_cls_table: Dict[str, RegisteredPurePathClass] = {}
 
     def __new__(cls: Type["PurePath"], *args) -> "PurePath":
         return cls._create_uri_path(args, PurePath)
 
+    def __reduce__(self):
+        # Rebuild from the parsed parts, which skips dispatch and reparsing
+        return _make_path, (type(self), self._drv, self._root, _get_key(self))
+
     @classmethod
     def register(
         cls: Type["PurePath"], missing_deps: bool = False
     ) -> Callable[[Type["PurePath"]], Type["PurePath"]]:
         def _f(concrete_cls: Type[PurePath]) -> Type[PurePath]:
-            cls._uri_cls_repository.append(
-                RegisteredPurePathClass(missing_deps, concrete_cls)
-            )
+            registered_cls = RegisteredPurePathClass(missing_deps, concrete_cls)
+            cls._uri_cls_repository.append(registered_cls)
+            for scheme in getattr(concrete_cls._flavour, "schemes", []):  # type: ignore
+                cls._uri_cls_table[scheme] = registered_cls
             return concrete_cls
 
         return _f
 
     @classmethod
     def _create_uri_path(cls: Type["PurePath"], args, base_cls) -> "PurePath":
+        self = cls._dispatch_uri_path(args, base_cls)
+        # A query such as "?versionId=..." can only end the last argument
+        if args and isinstance(args[-1], str) and "?" in args[-1]:
+            self._apply_query(args[-1])
+        return self
+
+    def _apply_query(self, uri: str) -> None:
+        pass
+
+    @classmethod
+    def _dispatch_uri_path(cls: Type["PurePath"], args, base_cls) -> "PurePath":
         if cls is not base_cls:
             return cls._from_parts(args)  # type: ignore
 
+        # A scheme needs a colon, so plain local paths skip URI parsing.
+        if all(isinstance(a, str) and ":" not in a for a in args):
+            return cls._get_default_path_cls()._from_parts(args)  # type: ignore
+
+        # Every registered URI flavour splits a path the same way and only
+        # differs in the schemes it accepts, so parse once and dispatch on
+        # the scheme of the resulting drive.
+        try:
+            drv, root, parts = _parse_uri_args(args)
+        except ValueError:
+            drv = root = ""
+            parts = []
+        if drv == "":
+            return cls._get_default_path_cls()._from_parts(args)  # type: ignore
+
+        registered_cls = cls._uri_cls_table.get(_drive_scheme(drv))
+        if registered_cls is not None and not registered_cls.missing:
+            return registered_cls.cls._from_parsed_parts(drv, root, parts)  # type: ignore
+
         for registered_cls in reversed(cls._uri_cls_repository):
             try:
                 self = registered_cls.cls._from_parts(args)  # type: ignore
@@ -70,7 +138,9 @@ if sys.version_info < (3, 9):
 
 
 class Path(PurePath, pathlib.Path):
+    __slots__ = ()
     _uri_cls_repository: List[RegisteredPurePathClass] = []
+    _uri_cls_table: Dict[str, RegisteredPurePathClass] = {}
 
     def __new__(cls: Type["Path"], *args, **kwargs) -> "Path":
         self = cast(Path, cls._create_uri_path(args, Path))
@@ -83,6 +153,46 @@ class Path(PurePath, pathlib.Path):
             self._init()  # type: ignore
         return self
 
+    @classmethod
+    def stat_many(cls, paths, *, stream=False, counters=None, max_workers=16):
+        # Returns {path: stat result or None}, or an iterator over these pairs
+        # in completion order when `stream` is set. The requests made by each
+        # strategy are added up in `counters` when a dict is given.
+        pairs = Path._iter_many(
+            "_stat_many", paths, {} if counters is None else counters, max_workers
+        )
+        return pairs if stream else dict(pairs)
+
+    @classmethod
+    def exists_many(cls, paths, *, stream=False, counters=None, max_workers=16):
+        pairs = Path._iter_many(
+            "_exists_many", paths, {} if counters is None else counters, max_workers
+        )
+        return pairs if stream else dict(pairs)
+
+    @staticmethod
+    def _iter_many(method, paths, counters, max_workers):
+        groups = {}
+        for p in paths:
+            if not isinstance(p, Path):
+                p = Path(p)
+            groups.setdefault(type(p), []).append(p)
+        for path_cls, group in groups.items():
+            yield from getattr(path_cls, method)(group, counters, max_workers)
+
+    @classmethod
+    def _stat_many(cls, paths, counters, max_workers):
+        for p in paths:
+            try:
+                yield p, p.stat()
+            except (FileNotFoundError, NotADirectoryError):
+                yield p, None
+
+    @classmethod
+    def _exists_many(cls, paths, counters, max_workers):
+        for p, stat_result in cls._stat_many(paths, counters, max_workers):
+            yield p, stat_result is not None
+
     @classmethod
     def _get_default_path_cls(cls: Type["Path"]) -> Type["Path"]:
         from paaaaath.posix import PosixPath
@@ -177,7 +287,10 @@ _skeleton_accessor = _SkeletonAccessor()
 class _SkeletonPath(Path):
     __slots__ = ()
 
-    _accessor = _skeleton_accessor
+    # Before 3.10 the accessor lives in a slot of pathlib.Path and is set by
+    # _init(), so a class attribute would shadow it.
+    if (3, 10) <= sys.version_info:
+        _accessor = _skeleton_accessor
 
     def _init(self, template=None):
         super()._init(template)
@@ -202,6 +315,11 @@ class _SkeletonPath(Path):
     def absolute(self):
         raise NotImplementedError("absolute() is not supported")
 
+    def resolve(self, strict=False):
+        # pathlib calls stat() here to detect symlink loops, which would be
+        # a network request for remote paths
+        return self._from_parts((self._flavour.resolve(self, strict),))
+
     def stat(self):
         if (3, 10) <= sys.version_info:
             return
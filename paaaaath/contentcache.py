@@ -0,0 +1,176 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from typing import IO, Any, Callable, NamedTuple, Optional, Tuple
+
+DEFAULT_CONTENT_CACHE_BYTES = 1 << 30
+
+# Temporary files older than this are left over by crashed writers
+_STALE_TEMP_AGE = 3600.0
+# Eviction frees some room below max_bytes, so the next puts need no scan
+_EVICT_TO = 0.9
+
+_Key = Tuple[str, str, str]
+
+
+class ContentCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    max_bytes: int
+    currbytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ContentCache:
+    # Local copies of blob objects keyed by drive, key and the ETag or
+    # generation they were downloaded at, so a changed object is never served
+    # from an old copy. Entries are written to a temporary file and renamed
+    # into place, which lets processes share one directory. The modification
+    # time of an entry is refreshed on every hit and the least recently used
+    # entries are removed once the directory exceeds max_bytes. Each process
+    # adds what it writes to the size found by its last scan of the directory
+    # and scans again once that exceeds max_bytes, so writes of others are
+    # only seen then. The hit, miss and eviction counters are kept per process.
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_CONTENT_CACHE_BYTES):
+        if max_bytes <= 0:
+            raise ValueError(f"max_bytes must be positive. but {max_bytes} was given.")
+
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._currbytes: Optional[int] = None
+
+    def _entry_path(self, key: _Key) -> str:
+        digest = hashlib.sha256("\0".join(key).encode()).hexdigest()
+        return os.path.join(self.directory, digest)
+
+    def get(self, key: _Key) -> Optional[str]:
+        # Returns the local path of a cached entry
+        path = self._entry_path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._misses += 1
+            return None
+
+        with self._lock:
+            self._hits += 1
+        return path
+
+    def put(self, key: _Key, write: Callable[[IO[bytes]], Any]) -> str:
+        # Stores what write() writes to the given file and returns its path
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+                size = f.tell()
+            path = self._entry_path(key)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+        with self._lock:
+            if self._currbytes is not None:
+                self._currbytes += size
+            scan = self._currbytes is None or self.max_bytes < self._currbytes
+        if scan:
+            self._evict(keep=path)
+        return path
+
+    def _evict(self, keep: str) -> None:
+        now = time.time()
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if entry.name.endswith(".tmp"):
+                    if _STALE_TEMP_AGE < now - st.st_mtime:
+                        _unlink(entry.path)
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+
+        entries.sort()
+        if self.max_bytes < total:
+            target = int(self.max_bytes * _EVICT_TO)
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                if path == keep:
+                    continue
+                if _unlink(path):
+                    with self._lock:
+                        self._evictions += 1
+                total -= size
+        with self._lock:
+            self._currbytes = total
+
+    def clear(self) -> None:
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(".tmp"):
+                    _unlink(entry.path)
+        with self._lock:
+            self._currbytes = None
+
+    def info(self) -> ContentCacheInfo:
+        currbytes = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(".tmp"):
+                    try:
+                        currbytes += entry.stat().st_size
+                    except FileNotFoundError:
+                        pass
+        with self._lock:
+            return ContentCacheInfo(
+                self._hits, self._misses, self._evictions, self.max_bytes, currbytes
+            )
+
+
+def _unlink(path: str) -> bool:
+    # Another process may have removed it first
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+# Shared by S3Path and GCSPath, installed by enable_content_cache()
+_content_cache: Optional[ContentCache] = None
+
+
+def enable_content_cache(
+    directory: str, max_bytes: int = DEFAULT_CONTENT_CACHE_BYTES
+) -> None:
+    global _content_cache
+    _content_cache = ContentCache(directory, max_bytes)
+
+
+def disable_content_cache() -> None:
+    global _content_cache
+    _content_cache = None
+
+
+def content_cache_info() -> Optional[ContentCacheInfo]:
+    if _content_cache is None:
+        return None
+    return _content_cache.info()
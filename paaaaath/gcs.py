@@ -1,19 +1,54 @@
-from smart_open import smart_open_lib
-from smart_open.constants import WRITE_BINARY
-
-try:
-    from google.api_core.exceptions import NotFound
-    from google.cloud import storage
-    from smart_open import gcs
-except ImportError:
-    MISSING_DEPS = True
-else:
-    MISSING_DEPS = False
-
-from paaaaath.blob import PureBlobPath, _SkeletonBlobPath, to_dir_key, to_file_key
-from paaaaath.common import Path, PurePath
+from stat import S_ISDIR
+from typing import Any, Dict
+
+from paaaaath import contentcache
+from paaaaath.blob import (
+    _IMPLICIT_DIR,
+    PureBlobPath,
+    _SkeletonBlobPath,
+    file_stat,
+    to_dir_key,
+)
+from paaaaath.common import Path, PurePath, _has_module
 from paaaaath.uri import _UriFlavour
 
+# only probe the SDK here, importing it costs hundreds of milliseconds
+MISSING_DEPS = not _has_module("google.cloud.storage")
+
+# Listings only ask for what _blob_stat reads
+_LIST_FIELDS = "items(name,size,updated,etag,generation),prefixes,nextPageToken"
+
+
+def _blob_stat(blob):
+    return file_stat(
+        blob.size, blob.updated.timestamp(), blob.etag, str(blob.generation)
+    )
+
+
+class _KnownBlob:
+    # The blob with its size already known, anything else is the blob's own
+    def __init__(self, blob, size):
+        self._blob = blob
+        self.size = size
+
+    def __getattr__(self, name):
+        return getattr(self._blob, name)
+
+
+class _KnownBlobClient:
+    # smart_open fetches the blob metadata with client.bucket().get_blob()
+    # before the first read. This stands in for the client and hands it the
+    # blob with its known size instead. test_known_blob_client checks that
+    # smart_open still reads this way.
+    def __init__(self, blob, size):
+        self._blob = _KnownBlob(blob, size)
+
+    def bucket(self, name):
+        return self
+
+    def get_blob(self, key):
+        return self._blob
+
 
 class _GCSFlavour(_UriFlavour):
     schemes = ["gs"]
@@ -26,70 +61,149 @@ _gcs_flavour = _GCSFlavour()
 class PureGCSPath(PureBlobPath):
     __slots__ = ()
     _flavour = _gcs_flavour
+    _version_query = "generation"
 
 
 @Path.register(MISSING_DEPS)
 class GCSPath(_SkeletonBlobPath, PureGCSPath):
     __slots__ = ()
+    _bucket_handles: Dict[str, Any] = {}
 
     def open(self, *args, **kwargs):
-        kwargs = {**kwargs, "transport_params": {"client": self._client}}
+        from smart_open import smart_open_lib
+
+        self._before_write(args[0] if args else kwargs.get("mode", "r"))
+        f = self._open_cached(args, kwargs)
+        if f is not None:
+            return f
+
+        client = self._client
+        if self.version is not None:
+            stat_result = self.stat()
+        else:
+            stat_result = self._get_stat_result()
+        if stat_result is not None and not S_ISDIR(stat_result.st_mode):
+            # Only reads keep their metadata, pin the generation it describes
+            generation = int(stat_result.version) if stat_result.version else None
+            blob = self._bucket_handle().blob(self.key, generation=generation)
+            client = _KnownBlobClient(blob, stat_result.st_size)
+        kwargs = {**kwargs, "transport_params": {"client": client}}
         return smart_open_lib.open(str(self), *args, **kwargs)
 
+    def read_bytes(self):
+        if contentcache._content_cache is not None:
+            return super().read_bytes()
+        generation = int(self.version) if self.version is not None else None
+        blob = self._bucket_handle().blob(self.key, generation=generation)
+        return blob.download_as_bytes()
+
     def touch(self, mode=0x666, exist_ok=True):
-        if not self._exists(to_dir_key(self.parent.key)):
-            raise FileNotFoundError
+        from google.api_core.exceptions import NotFound
+
+        self._before_write()
+        self._check_parent()
 
         if exist_ok:
             try:
-                bucket = self._client.get_bucket(self.bucket)
-                bucket.copy_blob(bucket.get_blob(self.key), bucket, self.key)
+                bucket = self._bucket_handle()
+                bucket.copy_blob(bucket.blob(self.key), bucket, self.key)
             except NotFound:
                 pass
             else:
                 return
         if not exist_ok and self.exists():
             raise FileExistsError
-        gcs.open(self.bucket, self.key, WRITE_BINARY, client=self._client).close()
-
-    def exists(self):
-        file_key = to_file_key(self.key)
-        dir_key = to_dir_key(self.key)
-        return self._exists(file_key) or self._exists(dir_key)
+        self._bucket_handle().blob(self.key).upload_from_string(b"")
 
     def _mkdir(self, mode=0x777):
-        if not self._exists(to_dir_key(self.parent.key)):
-            raise FileNotFoundError
+        if self.implicit_dirs:
+            return
+
+        self._before_write()
+        self._check_parent()
 
         if self.exists():
             raise OSError
-        gcs.open(
-            self.bucket, to_dir_key(self.key), WRITE_BINARY, client=self._client
-        ).close()
-
-    def iterdir(self):
-        prefix = to_dir_key(self.key) if self.key != "" else self.key
-        blobs = self._client.list_blobs(self.bucket, prefix=prefix, delimiter="/")
-        for blob in blobs:
-            if blob.name in {".", "..", prefix}:
-                continue
-            yield GCSPath(f"{self.anchor}/{blob.name}")
-        for blob_prefix in blobs.prefixes:
-            yield GCSPath(f"{self.anchor}/{blob_prefix}")
-
-    def is_dir(self):
-        dir_key = to_dir_key(self.key)
-        blob = self._client.get_bucket(self.bucket).get_blob(dir_key)
+        self._bucket_handle().blob(to_dir_key(self.key)).upload_from_string(b"")
+
+    def _bucket_handle(self):
+        # Bucket handles are built without a request, so keep one per bucket
+        # name for the current client instead of fetching it by get_bucket.
+        client = self._client
+        bucket = self._bucket_handles.get(self.bucket)
+        if bucket is None or bucket.client is not client:
+            bucket = client.bucket(self.bucket)
+            self._bucket_handles[self.bucket] = bucket
+        return bucket
+
+    def _list_pages(self, prefix, start_after="", delimiter="/", page_size=None):
+        # startOffset is inclusive, unlike StartAfter of S3
+        blobs = self._client.list_blobs(
+            self._bucket_handle(),
+            prefix=prefix,
+            delimiter=delimiter or None,
+            start_offset=start_after or None,
+            fields=_LIST_FIELDS,
+            page_size=page_size or self.list_page_size,
+        )
+        for page in blobs.pages:
+            files = [(blob.name, _blob_stat(blob)) for blob in page]
+            dirs = [(name, _IMPLICIT_DIR) for name in page.prefixes]
+            yield [e for e in files + dirs if e[0] != start_after]
+
+    def _download(self, key, stat_result, f):
+        from google.api_core.exceptions import NotFound
+
+        generation = int(stat_result.version) if stat_result.version else None
+        try:
+            self._bucket_handle().blob(key, generation=generation).download_to_file(f)
+        except NotFound as e:
+            raise FileNotFoundError(f"{self} has changed") from e
+
+    def _get_range(self, key, start, end, stat_result=None):
+        from google.api_core.exceptions import NotFound, RequestRangeNotSatisfiable
+
+        version = self.version if stat_result is None else stat_result.version
+        generation = int(version) if version else None
+        blob = self._bucket_handle().blob(key, generation=generation)
+        try:
+            return blob.download_as_bytes(start=start, end=end - 1)
+        except RequestRangeNotSatisfiable:
+            return b""
+        except NotFound as e:
+            raise FileNotFoundError(f"No such file or directory: '{self}'") from e
+
+    def _head(self, key, version=None):
+        generation = int(version) if version is not None else None
+        blob = self._bucket_handle().get_blob(key, generation=generation)
         if blob is None:
-            return False
-        return blob.size == 0
+            return None
+        return _blob_stat(blob)
+
+    def _list(self, prefix, max_keys):
+        from google.api_core.exceptions import Forbidden
+
+        blobs = self._client.list_blobs(
+            self._bucket_handle(),
+            prefix=prefix,
+            max_results=max_keys,
+            fields=_LIST_FIELDS,
+        )
+        try:
+            page = next(blobs.pages)
+        except Forbidden as e:
+            raise PermissionError(f"Permission denied: '{self}'") from e
+        entries = [(blob.name, _blob_stat(blob)) for blob in page]
+        return entries, blobs.next_page_token is not None
 
     def _exists(self, key) -> bool:
         if key == "" or key == "/":
             return True
 
-        return self._client.get_bucket(self.bucket).get_blob(key) is not None
+        return self._bucket_handle().blob(key).exists()
 
     @classmethod
     def _create_client(cls):
+        from google.cloud import storage
+
         return storage.Client()
@@ -1,15 +1,16 @@
-from smart_open import smart_open_lib
+import io
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-try:
-    from requests.exceptions import HTTPError
-except ImportError:
-    MISSING_DEPS = True
-else:
-    MISSING_DEPS = False
-
-from paaaaath.common import Path, PurePath, _SkeletonPath
+from paaaaath import httpcache, ranges
+from paaaaath.common import Path, PurePath, _has_module, _SkeletonPath
 from paaaaath.uri import _UriFlavour
 
+# requests is imported lazily by exists()
+MISSING_DEPS = not _has_module("requests")
+
+# Bytes read at a time from a streamed response
+_CHUNK_SIZE = 1 << 16
+
 
 class _HttpFlavour(_UriFlavour):
     schemes = ["http", "https"]
@@ -18,6 +19,23 @@ class _HttpFlavour(_UriFlavour):
 _http_flavour = _HttpFlavour()
 
 
+def _read_at_most(res, max_bytes):
+    # The body of a streamed response, or None once it exceeds max_bytes,
+    # which Content-Length may tell before reading any of it
+    length = res.headers.get("Content-Length")
+    if length is not None and length.isdigit() and max_bytes < int(length):
+        return None
+
+    chunks = []
+    size = 0
+    for chunk in res.iter_content(_CHUNK_SIZE):
+        size += len(chunk)
+        if max_bytes < size:
+            return None
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
 @PurePath.register()
 class PureHttpPath(PurePath):
     _flavour = _http_flavour
@@ -27,13 +45,120 @@ class PureHttpPath(PurePath):
 @Path.register(MISSING_DEPS)
 class HttpPath(_SkeletonPath, PureHttpPath):
     __slots__ = ()
+    # Seconds to wait for the server to connect or send data, None waits forever
+    timeout = 60.0
 
     def open(self, *args, **kwargs):
+        from smart_open import smart_open_lib
+
+        cache = httpcache._http_cache
+        mode = args[0] if args else kwargs.get("mode", "r")
+        if cache is not None and "r" in mode and "+" not in mode:
+            body = self._fetch(cache)
+            if body is not None:
+                f = io.BytesIO(body)
+                # smart_open infers the compression from the name
+                f.name = str(self)
+                return smart_open_lib.open(f, *args, **kwargs)
+            # Larger than the cache, so it is streamed instead
+
+        transport_params = {
+            "timeout": self.timeout,
+            **kwargs.get("transport_params", {}),
+        }
+        kwargs = {**kwargs, "transport_params": transport_params}
         return smart_open_lib.open(str(self), *args, **kwargs)
 
+    def _fetch(self, cache):
+        # Returns the body through the cache, or None if it exceeds max_bytes
+        import requests
+
+        url = str(self)
+        entry = cache.get(url)
+        if entry is not None and entry.is_fresh():
+            cache.record(hit=True)
+            return entry.body
+
+        headers = {} if entry is None else entry.validators()
+        with requests.get(
+            url, headers=headers, stream=True, timeout=self.timeout
+        ) as res:
+            if res.status_code == 304 and entry is not None:
+                cache.record(revalidated=True)
+                body = entry.body
+                entry = httpcache.make_entry(body, res.headers, entry)
+            else:
+                res.raise_for_status()
+                cache.record()
+                body = _read_at_most(res, cache.max_bytes)
+                if body is None:
+                    cache.invalidate(url)
+                    return None
+                entry = httpcache.make_entry(body, res.headers)
+
+        if entry is None:
+            cache.invalidate(url)
+        else:
+            cache.put(url, entry)
+        return body
+
+    def _get_range(self, start, end):
+        import requests
+
+        res = requests.get(
+            str(self),
+            headers={"Range": f"bytes={start}-{end - 1}"},
+            timeout=self.timeout,
+        )
+        if res.status_code == 416:
+            return b""
+        res.raise_for_status()
+        if res.status_code == 206:
+            return res.content
+        # The server ignored the range and sent the whole resource
+        return res.content[start:end]
+
+    def read_range(self, offset, length):
+        if offset < 0 or length < 0:
+            raise ValueError(f"invalid range. offset={offset}, length={length}")
+        if length == 0:
+            return b""
+        return self._get_range(offset, offset + length)
+
+    def read_ranges(
+        self,
+        offsets_and_lengths,
+        *,
+        max_gap=ranges.DEFAULT_MAX_GAP,
+        max_size=ranges.DEFAULT_MAX_RANGE_SIZE,
+        max_workers=ranges.DEFAULT_MAX_WORKERS,
+    ):
+        return ranges.read_ranges(
+            offsets_and_lengths, self._get_range, max_gap, max_size, max_workers
+        )
+
     def exists(self):
-        try:
-            self.open()
-        except HTTPError:
-            return False
-        return True
+        import requests
+
+        # Neither request reads the body nor goes through the HTTP cache
+        with requests.head(
+            str(self), allow_redirects=True, timeout=self.timeout
+        ) as res:
+            if res.status_code not in {405, 501}:
+                return res.ok
+        # The server refuses HEAD, so the body of a GET is left unread
+        with requests.get(str(self), stream=True, timeout=self.timeout) as res:
+            return res.ok
+
+    @classmethod
+    def _stat_many(cls, paths, counters, max_workers):
+        raise NotImplementedError("stat() is not supported")
+
+    @classmethod
+    def _exists_many(cls, paths, counters, max_workers):
+        # There is no stat() to derive it from, so every path is requested
+        with ThreadPoolExecutor(max_workers) as executor:
+            futures = {executor.submit(p.exists): p for p in paths}
+            for future in as_completed(futures):
+                counters["probe"] = counters.get("probe", 0) + 1
+                yield futures[future], future.result()
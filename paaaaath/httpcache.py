@@ -0,0 +1,159 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Mapping, NamedTuple, Optional
+
+DEFAULT_HTTP_CACHE_BYTES = 64 << 20
+
+
+class HttpCacheEntry(NamedTuple):
+    body: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    expires: float
+
+    def is_fresh(self) -> bool:
+        return time.monotonic() < self.expires
+
+    def validators(self) -> Mapping[str, str]:
+        headers = {}
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCacheInfo(NamedTuple):
+    hits: int
+    revalidations: int
+    misses: int
+    evictions: int
+    max_bytes: int
+    currbytes: int
+
+
+def freshness_lifetime(headers: Mapping[str, str]) -> Optional[float]:
+    # Seconds a response stays fresh by its Cache-Control and Age headers,
+    # None if it must not be stored at all.
+    directives = {}
+    for directive in headers.get("Cache-Control", "").split(","):
+        name, _, value = directive.strip().partition("=")
+        directives[name.lower()] = value.strip('"')
+
+    if "no-store" in directives:
+        return None
+    if "no-cache" in directives:
+        return 0.0
+    try:
+        max_age = float(directives.get("max-age", 0))
+        age = float(headers.get("Age", 0))
+    except ValueError:
+        return 0.0
+    return max(0.0, max_age - age)
+
+
+def make_entry(
+    body: bytes, headers: Mapping[str, str], stale: Optional[HttpCacheEntry] = None
+) -> Optional[HttpCacheEntry]:
+    # Builds the entry of a response, or of a 304 response which refreshes the
+    # stale entry. None if the response must not or need not be stored.
+    lifetime = freshness_lifetime(headers)
+    etag = headers.get("ETag", stale and stale.etag)
+    last_modified = headers.get("Last-Modified", stale and stale.last_modified)
+    if lifetime is None or (lifetime == 0 and etag is None and last_modified is None):
+        return None
+    return HttpCacheEntry(body, etag, last_modified, time.monotonic() + lifetime)
+
+
+class HttpCache:
+    # Response bodies of HttpPath reads keyed by URL, together with their
+    # validators. Fresh entries are served without a request and stale ones
+    # are revalidated with a conditional request. The least recently used
+    # entries are evicted once the bodies exceed max_bytes.
+    def __init__(self, max_bytes: int = DEFAULT_HTTP_CACHE_BYTES):
+        if max_bytes <= 0:
+            raise ValueError(f"max_bytes must be positive. but {max_bytes} was given.")
+
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, HttpCacheEntry]" = OrderedDict()
+        self._currbytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._revalidations = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, url: str) -> Optional[HttpCacheEntry]:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+            return entry
+
+    def put(self, url: str, entry: HttpCacheEntry) -> None:
+        if self.max_bytes < len(entry.body):
+            self.invalidate(url)
+            return
+
+        with self._lock:
+            old = self._entries.pop(url, None)
+            if old is not None:
+                self._currbytes -= len(old.body)
+            self._entries[url] = entry
+            self._currbytes += len(entry.body)
+            while self.max_bytes < self._currbytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._currbytes -= len(evicted.body)
+                self._evictions += 1
+
+    def invalidate(self, url: str) -> None:
+        with self._lock:
+            old = self._entries.pop(url, None)
+            if old is not None:
+                self._currbytes -= len(old.body)
+
+    def record(self, hit: bool = False, revalidated: bool = False) -> None:
+        with self._lock:
+            if hit:
+                self._hits += 1
+            elif revalidated:
+                self._revalidations += 1
+            else:
+                self._misses += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._currbytes = 0
+
+    def info(self) -> HttpCacheInfo:
+        with self._lock:
+            return HttpCacheInfo(
+                self._hits,
+                self._revalidations,
+                self._misses,
+                self._evictions,
+                self.max_bytes,
+                self._currbytes,
+            )
+
+
+# Used by HttpPath, installed by enable_http_cache()
+_http_cache: Optional[HttpCache] = None
+
+
+def enable_http_cache(max_bytes: int = DEFAULT_HTTP_CACHE_BYTES) -> None:
+    global _http_cache
+    _http_cache = HttpCache(max_bytes)
+
+
+def disable_http_cache() -> None:
+    global _http_cache
+    _http_cache = None
+
+
+def http_cache_info() -> Optional[HttpCacheInfo]:
+    if _http_cache is None:
+        return None
+    return _http_cache.info()
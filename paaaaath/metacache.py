@@ -0,0 +1,269 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Iterable, NamedTuple, Optional, Tuple
+
+DEFAULT_METADATA_CACHE_SIZE = 65536
+DEFAULT_METADATA_CACHE_TTL = 60.0
+
+_Key = Tuple[str, str]
+
+
+class MetadataCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+
+
+class MetadataCache:
+    # Stat results of blob paths keyed by drive and key. None is stored for
+    # paths known to be missing. Entries expire after their TTL and the least
+    # recently used one is evicted once maxsize is reached.
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_METADATA_CACHE_SIZE,
+        ttl: float = DEFAULT_METADATA_CACHE_TTL,
+        negative_ttl: Optional[float] = None,
+        seed_from_listings: bool = True,
+    ):
+        if maxsize <= 0:
+            raise ValueError(f"maxsize must be positive. but {maxsize} was given.")
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self.seed_from_listings = seed_from_listings
+        self._entries: "OrderedDict[_Key, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: _Key) -> Tuple[bool, Any]:
+        # Returns whether the key is cached and its stat result
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self._misses += 1
+                return False, None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return True, entry[1]
+
+    def put(self, key: _Key, stat_result: Any, ttl: Optional[float] = None) -> None:
+        self.put_many([(key, stat_result)], ttl)
+
+    def put_many(
+        self, items: Iterable[Tuple[_Key, Any]], ttl: Optional[float] = None
+    ) -> None:
+        # Puts the entries of a listing page at once
+        now = time.monotonic()
+        with self._lock:
+            for key, stat_result in items:
+                entry_ttl = self._entry_ttl(stat_result, ttl)
+                if entry_ttl <= 0:
+                    continue
+
+                self._entries[key] = (now + entry_ttl, stat_result)
+                self._entries.move_to_end(key)
+                if self.maxsize < len(self._entries):
+                    self._entries.popitem(last=False)
+                    self._evictions += 1
+
+    def _entry_ttl(self, stat_result: Any, ttl: Optional[float]) -> float:
+        if ttl is not None:
+            return ttl
+        return self.ttl if stat_result is not None else self.negative_ttl
+
+    def invalidate(self, key: _Key) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def info(self) -> MetadataCacheInfo:
+        with self._lock:
+            return MetadataCacheInfo(
+                self._hits,
+                self._misses,
+                self._evictions,
+                self.maxsize,
+                len(self._entries),
+            )
+
+
+class SQLiteMetadataCache(MetadataCache):
+    # The same cache in an SQLite database in WAL mode, which the processes
+    # of one host share by opening the same file. Expiry uses wall clock
+    # time, recency is only refreshed once a second per entry, and maxsize
+    # is enforced every few puts, so it is approximate. The hit, miss and
+    # eviction counters are kept per process.
+    _TOUCH_INTERVAL = 1.0
+
+    def __init__(
+        self,
+        path: str,
+        maxsize: int = DEFAULT_METADATA_CACHE_SIZE,
+        ttl: float = DEFAULT_METADATA_CACHE_TTL,
+        negative_ttl: Optional[float] = None,
+        seed_from_listings: bool = True,
+    ):
+        super().__init__(maxsize, ttl, negative_ttl, seed_from_listings)
+        self.path = path
+        self._local = threading.local()
+        self._puts = 0
+        self._evict_every = max(1, min(64, maxsize // 16))
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "drive TEXT NOT NULL, key TEXT NOT NULL, expires REAL NOT NULL, "
+            "last_used REAL NOT NULL, stat TEXT, PRIMARY KEY (drive, key)"
+            ") WITHOUT ROWID"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections must neither cross threads nor survive a fork
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: _Key) -> Tuple[bool, Any]:
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT expires, last_used, stat FROM entries WHERE drive = ? AND key = ?",
+            key,
+        ).fetchone()
+        now = time.time()
+        if row is None or row[0] <= now:
+            with self._lock:
+                self._misses += 1
+            return False, None
+
+        if self._TOUCH_INTERVAL < now - row[1]:
+            conn.execute(
+                "UPDATE entries SET last_used = ? WHERE drive = ? AND key = ?",
+                (now, *key),
+            )
+        with self._lock:
+            self._hits += 1
+        return True, _decode_stat(row[2])
+
+    def put_many(
+        self, items: Iterable[Tuple[_Key, Any]], ttl: Optional[float] = None
+    ) -> None:
+        # One transaction for all the entries, as a commit per entry syncs the
+        # WAL every time
+        now = time.time()
+        rows = []
+        for key, stat_result in items:
+            entry_ttl = self._entry_ttl(stat_result, ttl)
+            if 0 < entry_ttl:
+                rows.append((*key, now + entry_ttl, now, _encode_stat(stat_result)))
+        if not rows:
+            return
+
+        conn = self._conn()
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)", rows
+            )
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        with self._lock:
+            before = self._puts
+            self._puts += len(rows)
+            evict = before // self._evict_every < self._puts // self._evict_every
+        if evict:
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute("DELETE FROM entries WHERE expires <= ?", (now,))
+        (count,) = conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+        if count <= self.maxsize:
+            return
+
+        cur = conn.execute(
+            "DELETE FROM entries WHERE (drive, key) IN ("
+            "SELECT drive, key FROM entries ORDER BY last_used LIMIT ?)",
+            (count - self.maxsize,),
+        )
+        with self._lock:
+            self._evictions += cur.rowcount
+
+    def invalidate(self, key: _Key) -> None:
+        self._conn().execute("DELETE FROM entries WHERE drive = ? AND key = ?", key)
+
+    def clear(self) -> None:
+        self._conn().execute("DELETE FROM entries")
+
+    def info(self) -> MetadataCacheInfo:
+        (count,) = self._conn().execute("SELECT COUNT(*) FROM entries").fetchone()
+        with self._lock:
+            return MetadataCacheInfo(
+                self._hits, self._misses, self._evictions, self.maxsize, count
+            )
+
+
+def _encode_stat(stat_result: Any) -> Optional[str]:
+    return None if stat_result is None else json.dumps(tuple(stat_result))
+
+
+def _decode_stat(data: Optional[str]) -> Any:
+    from paaaaath.blob import BlobStat
+
+    return None if data is None else BlobStat(*json.loads(data))
+
+
+# Shared by S3Path and GCSPath, installed by enable_metadata_cache()
+_metadata_cache: Optional[MetadataCache] = None
+
+
+def enable_metadata_cache(
+    maxsize: int = DEFAULT_METADATA_CACHE_SIZE,
+    ttl: float = DEFAULT_METADATA_CACHE_TTL,
+    negative_ttl: Optional[float] = None,
+    seed_from_listings: bool = True,
+    path: Optional[str] = None,
+) -> None:
+    # With a path the cache lives in that SQLite file and is shared by every
+    # process which enables it with the same path.
+    global _metadata_cache
+    if path is None:
+        _metadata_cache = MetadataCache(maxsize, ttl, negative_ttl, seed_from_listings)
+    else:
+        _metadata_cache = SQLiteMetadataCache(
+            path, maxsize, ttl, negative_ttl, seed_from_listings
+        )
+
+
+def disable_metadata_cache() -> None:
+    global _metadata_cache
+    _metadata_cache = None
+
+
+def metadata_cache_info() -> Optional[MetadataCacheInfo]:
+    if _metadata_cache is None:
+        return None
+    return _metadata_cache.info()
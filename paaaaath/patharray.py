@@ -0,0 +1,209 @@
+from array import array
+from os.path import commonprefix
+from typing import Dict, Iterable, Iterator, List, Tuple, Type, Union, overload
+
+from paaaaath.common import PurePath, _get_key, _make_path
+from paaaaath.uri import _uri_flavour
+
+_Anchor = Tuple[Type[PurePath], str, str]
+
+
+class PathArray:
+    # Paths are stored as an index into a table of anchors (path class, drive
+    # and root) plus a "/" separated key, so bulk operations work on plain
+    # strings and path objects are only created when elements are accessed.
+    __slots__ = ("_anchors", "_anchor_ids", "_keys")
+
+    def __init__(
+        self,
+        paths: Iterable[Union[str, PurePath]] = (),
+        path_cls: Type[PurePath] = PurePath,
+    ):
+        self._anchors: List[_Anchor] = []
+        self._anchor_ids = array("L")
+        self._keys: List[str] = []
+
+        anchor_index: Dict[_Anchor, int] = {}
+        drive_index: Dict[Tuple[str, str], int] = {}
+        prefix_index: Dict[str, int] = {}
+        for p in paths:
+            if isinstance(p, str) and ":" in p:
+                # URIs sharing an already seen "scheme://netloc/" prefix skip
+                # urlparse unless they carry a query, fragment or params.
+                prefix = p[: p.find("/", p.find("://") + 3) + 1]
+                anchor_id = prefix_index.get(prefix)
+                if anchor_id is not None and not any(c in p for c in "?#;"):
+                    self._anchor_ids.append(anchor_id)
+                    self._keys.append(_normalize_key(p[len(prefix) :]))
+                    continue
+
+                drv, root, rel = _uri_flavour.splitroot(p)
+                anchor_id = drive_index.get((drv, root))
+                if anchor_id is None:
+                    anchor_path = path_cls(drv + root)
+                    if anchor_path._drv == drv:  # type: ignore
+                        anchor_id = self._add_anchor(anchor_index, anchor_path)
+                        drive_index[(drv, root)] = anchor_id
+                if anchor_id is not None:
+                    if prefix == drv + root:
+                        prefix_index[prefix] = anchor_id
+                    self._anchor_ids.append(anchor_id)
+                    self._keys.append(_normalize_key(rel))
+                    continue
+
+            if not isinstance(p, PurePath):
+                p = path_cls(p)
+            self._anchor_ids.append(self._add_anchor(anchor_index, p))
+            self._keys.append(_get_key(p))
+
+    def _add_anchor(self, anchor_index: Dict[_Anchor, int], path: PurePath) -> int:
+        anchor = (type(path), path._drv, path._root)  # type: ignore
+        anchor_id = anchor_index.get(anchor)
+        if anchor_id is None:
+            anchor_id = len(self._anchors)
+            anchor_index[anchor] = anchor_id
+            self._anchors.append(anchor)
+        return anchor_id
+
+    @classmethod
+    def _from_columns(
+        cls, anchors: List[_Anchor], anchor_ids: "array[int]", keys: List[str]
+    ) -> "PathArray":
+        self = object.__new__(cls)
+        self._anchors = anchors
+        self._anchor_ids = anchor_ids
+        self._keys = keys
+        return self
+
+    def _make_path(self, anchor_id: int, key: str) -> PurePath:
+        return _make_path(*self._anchors[anchor_id], key)
+
+    def __reduce__(self):
+        # Keys of a listing usually share a long prefix, so store it once.
+        # Anchor ids are narrowed to the smallest integer type which fits.
+        prefix = commonprefix(self._keys)
+        typecode = next(
+            t for t in "BHL" if len(self._anchors) <= 1 << (8 * array(t).itemsize)
+        )
+        return _rebuild_path_array, (
+            self._anchors,
+            array(typecode, self._anchor_ids),
+            prefix,
+            [key[len(prefix) :] for key in self._keys],
+        )
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __iter__(self) -> Iterator[PurePath]:
+        for anchor_id, key in zip(self._anchor_ids, self._keys):
+            yield self._make_path(anchor_id, key)
+
+    @overload
+    def __getitem__(self, index: int) -> PurePath:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "PathArray":
+        ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._from_columns(
+                self._anchors, self._anchor_ids[index], self._keys[index]
+            )
+        return self._make_path(self._anchor_ids[index], self._keys[index])
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({[str(p) for p in self]!r})"
+
+    @property
+    def name(self) -> List[str]:
+        return [key.rpartition("/")[2] for key in self._keys]
+
+    @property
+    def suffix(self) -> List[str]:
+        suffixes = []
+        for key in self._keys:
+            beg = key.rfind("/") + 1
+            i = key.rfind(".", beg)
+            suffixes.append(key[i:] if beg < i < len(key) - 1 else "")
+        return suffixes
+
+    @property
+    def stem(self) -> List[str]:
+        stems = []
+        for key in self._keys:
+            beg = key.rfind("/") + 1
+            i = key.rfind(".", beg)
+            stems.append(key[beg:i] if beg < i < len(key) - 1 else key[beg:])
+        return stems
+
+    @property
+    def parent(self) -> "PathArray":
+        keys = [key.rpartition("/")[0] for key in self._keys]
+        return self._from_columns(self._anchors, self._anchor_ids, keys)
+
+    def with_suffix(self, suffix: str) -> "PathArray":
+        if "/" in suffix or "\\" in suffix:
+            raise ValueError(f"Invalid suffix {suffix!r}")
+        if suffix and not suffix.startswith(".") or suffix == ".":
+            raise ValueError(f"Invalid suffix {suffix!r}")
+
+        keys = []
+        for i, key in enumerate(self._keys):
+            dirname, sep, name = key.rpartition("/")
+            if name == "":
+                raise ValueError(f"{self[i]!r} has an empty name")
+            keys.append(f"{dirname}{sep}{_split_suffix(name)[0]}{suffix}")
+        return self._from_columns(self._anchors, self._anchor_ids, keys)
+
+    def relative_to(self, other: Union[str, PurePath]) -> "PathArray":
+        if not isinstance(other, PurePath):
+            other = PurePath(other)
+        other_anchor = other.anchor
+        other_key = _get_key(other)
+        other_prefix = f"{other_key}/" if other_key != "" else ""
+
+        anchors: List[_Anchor] = []
+        anchor_ids = array("L")
+        anchor_index: Dict[int, int] = {}
+        keys = []
+        for i, (anchor_id, key) in enumerate(zip(self._anchor_ids, self._keys)):
+            path_cls, drv, root = self._anchors[anchor_id]
+            if drv + root != other_anchor or not (
+                key == other_key or key.startswith(other_prefix)
+            ):
+                raise ValueError(
+                    f"{str(self[i])!r} is not in the subpath of {str(other)!r}"
+                )
+
+            relative_id = anchor_index.get(anchor_id)
+            if relative_id is None:
+                relative_id = len(anchors)
+                anchor_index[anchor_id] = relative_id
+                anchors.append((path_cls, "", ""))
+            anchor_ids.append(relative_id)
+            keys.append(key[len(other_prefix) :])
+        return self._from_columns(anchors, anchor_ids, keys)
+
+
+def _rebuild_path_array(
+    anchors: List[_Anchor], anchor_ids: "array[int]", prefix: str, keys: List[str]
+) -> PathArray:
+    return PathArray._from_columns(
+        anchors, array("L", anchor_ids), [prefix + key for key in keys]
+    )
+
+
+def _normalize_key(rel: str) -> str:
+    if "//" in rel or "./" in rel or rel.endswith(("/", "/.")) or rel == ".":
+        return "/".join(x for x in rel.split("/") if x and x != ".")
+    return rel
+
+
+def _split_suffix(name: str) -> Tuple[str, str]:
+    i = name.rfind(".")
+    if 0 < i < len(name) - 1:
+        return name[:i], name[i:]
+    return name, ""
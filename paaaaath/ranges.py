@@ -0,0 +1,59 @@
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Tuple
+
+# Ranges closer than this are fetched together, wasting the gap between them
+DEFAULT_MAX_GAP = 8 << 10
+# Merging stops once a request would span more than this
+DEFAULT_MAX_RANGE_SIZE = 32 << 20
+DEFAULT_MAX_WORKERS = 8
+
+
+def coalesce(
+    ranges: Iterable[Tuple[int, int]], max_gap: int, max_size: int
+) -> List[Tuple[int, int]]:
+    # Merges (offset, length) ranges into sorted (start, end) spans
+    spans: List[Tuple[int, int]] = []
+    for offset, length in sorted(r for r in ranges if 0 < r[1]):
+        end = offset + length
+        if spans:
+            start, last_end = spans[-1]
+            if offset <= last_end + max_gap and max(end, last_end) - start <= max_size:
+                spans[-1] = (start, max(end, last_end))
+                continue
+        spans.append((offset, end))
+    return spans
+
+
+def read_ranges(
+    ranges: Iterable[Tuple[int, int]],
+    fetch: Callable[[int, int], bytes],
+    max_gap: int = DEFAULT_MAX_GAP,
+    max_size: int = DEFAULT_MAX_RANGE_SIZE,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> List[memoryview]:
+    # Reads (offset, length) ranges through fetch(start, end), which may
+    # return fewer bytes past the end of the object. The results are views of
+    # the fetched buffers in the order of `ranges`.
+    ranges = list(ranges)
+    for offset, length in ranges:
+        if offset < 0 or length < 0:
+            raise ValueError(f"invalid range. offset={offset}, length={length}")
+
+    spans = coalesce(ranges, max_gap, max_size)
+    if len(spans) <= 1 or max_workers <= 1:
+        buffers = [fetch(*span) for span in spans]
+    else:
+        with ThreadPoolExecutor(min(max_workers, len(spans))) as executor:
+            buffers = list(executor.map(lambda span: fetch(*span), spans))
+
+    starts = [start for start, _ in spans]
+    views = []
+    for offset, length in ranges:
+        if length == 0:
+            views.append(memoryview(b""))
+            continue
+        i = bisect_right(starts, offset) - 1
+        beg = offset - starts[i]
+        views.append(memoryview(buffers[i])[beg : beg + length])
+    return views
@@ -1,19 +1,43 @@
 import itertools
-
-from smart_open import smart_open_lib
-
-try:
-    import boto3
-    from botocore.exceptions import ClientError
-except ImportError:
-    MISSING_DEPS = True
-else:
-    MISSING_DEPS = False
-
-from paaaaath.blob import PureBlobPath, _SkeletonBlobPath, to_dir_key, to_file_key
-from paaaaath.common import Path, PurePath
+import shutil
+
+from paaaaath.blob import (
+    _IMPLICIT_DIR,
+    PureBlobPath,
+    _SkeletonBlobPath,
+    file_stat,
+    to_dir_key,
+)
+from paaaaath.common import Path, PurePath, _has_module
 from paaaaath.uri import _UriFlavour
 
+# boto3 and smart_open are imported by the methods which need them
+MISSING_DEPS = not _has_module("boto3")
+
+# Object settings touch() keeps, as a copy replacing the metadata resets them
+_COPIED_SETTINGS = [
+    "BucketKeyEnabled",
+    "CacheControl",
+    "ContentDisposition",
+    "ContentEncoding",
+    "ContentLanguage",
+    "ContentType",
+    "Expires",
+    "ObjectLockLegalHoldStatus",
+    "ObjectLockMode",
+    "ObjectLockRetainUntilDate",
+    "SSEKMSKeyId",
+    "ServerSideEncryption",
+    "StorageClass",
+    "WebsiteRedirectLocation",
+]
+
+
+def _content_stat(content):
+    return file_stat(
+        content["Size"], content["LastModified"].timestamp(), content.get("ETag")
+    )
+
 
 class _S3Flavour(_UriFlavour):
     schemes = ["s3"]
@@ -26,6 +50,7 @@ _s3_flavour = _S3Flavour()
 class PureS3Path(PureBlobPath):
     _flavour = _s3_flavour
     __slots__ = ()
+    _version_query = "versionId"
 
 
 @Path.register(MISSING_DEPS)
@@ -33,70 +58,144 @@ class S3Path(_SkeletonBlobPath, PureS3Path):
     __slots__ = ()
 
     def open(self, *args, **kwargs):
-        kwargs = {**kwargs, "transport_params": {"client": self._client}}
+        from smart_open import smart_open_lib
+
+        self._before_write(args[0] if args else kwargs.get("mode", "r"))
+        f = self._open_cached(args, kwargs)
+        if f is not None:
+            return f
+
+        transport_params = {"client": self._client}
+        if self.version is not None:
+            transport_params["version_id"] = self.version
+        kwargs = {**kwargs, "transport_params": transport_params}
         return smart_open_lib.open(str(self), *args, **kwargs)
 
     def touch(self, mode=0x666, exist_ok=True):
-        if not self._exists(to_dir_key(self.parent.key)):
-            raise FileNotFoundError
+        from botocore.exceptions import ClientError
+
+        self._before_write()
+        self._check_parent()
 
         if exist_ok:
             try:
+                head = self._client.head_object(Bucket=self.bucket, Key=self.key)
+            except ClientError as e:
+                if e.response["Error"]["Code"] not in {"404", "NoSuchKey"}:
+                    raise
+            else:
+                # copying an object onto itself is only allowed with new metadata.
+                # Copy errors are raised, as a PUT would empty the object.
+                settings = {k: head[k] for k in _COPIED_SETTINGS if k in head}
                 source = f"{self.bucket}/{self.key}"
                 self._client.copy_object(
-                    CopySource=source, Bucket=self.bucket, Key=self.key
+                    CopySource=source,
+                    Bucket=self.bucket,
+                    Key=self.key,
+                    MetadataDirective="REPLACE",
+                    Metadata=head.get("Metadata", {}),
+                    **settings,
                 )
-            except ClientError:
-                pass
-            else:
                 return
-        if not exist_ok and self.exists():
+        elif self.exists():
             raise FileExistsError
         self._client.put_object(Bucket=self.bucket, Key=self.key)
 
-    def exists(self):
-        file_key = to_file_key(self.key)
-        dir_key = to_dir_key(self.key)
-        return self._exists(file_key) or self._exists(dir_key)
-
     def _mkdir(self, mode=0x777):
-        if not self._exists(to_dir_key(self.parent.key)):
-            raise FileNotFoundError
+        if self.implicit_dirs:
+            return
+
+        self._before_write()
+        self._check_parent()
 
         if self.exists():
             raise OSError
         self._client.put_object(Bucket=self.bucket, Key=to_dir_key(self.key))
 
-    def iterdir(self):
-        key = to_dir_key(self.key) if self.key != "" else self.key
-        cur = self._client.list_objects_v2(
-            Bucket=self.bucket, Prefix=key, Delimiter="/"
-        )
+    def _list_pages(self, prefix, start_after="", delimiter="/", page_size=None):
+        kwargs = {"Bucket": self.bucket, "Prefix": prefix}
+        if page_size or self.list_page_size:
+            kwargs["MaxKeys"] = page_size or self.list_page_size
+        if delimiter != "":
+            kwargs["Delimiter"] = delimiter
+        if start_after != "":
+            kwargs["StartAfter"] = start_after
         while True:
-            file_names = (c["Key"] for c in cur.get("Contents", []))
-            dir_names = (c["Prefix"] for c in cur.get("CommonPrefixes", []))
-            for name in itertools.chain(dir_names, file_names):
-                if name in {".", "..", "", key}:
-                    continue
-                yield S3Path(f"{self.anchor}/{name}")
-            if not cur["IsTruncated"]:
+            res = self._client.list_objects_v2(**kwargs)
+            files = ((c["Key"], _content_stat(c)) for c in res.get("Contents", []))
+            dirs = ((c["Prefix"], _IMPLICIT_DIR) for c in res.get("CommonPrefixes", []))
+            yield list(itertools.chain(dirs, files))
+            if not res["IsTruncated"]:
                 break
-            cur = self._client.list_objects_v2(
-                Bucket=self.bucket,
-                Prefix=key,
-                Delimiter="/",
-                ContinuationToken=cur["NextContinuationToken"],
-            )
+            kwargs["ContinuationToken"] = res["NextContinuationToken"]
+
+    def _pinning(self, stat_result):
+        version = self.version if stat_result is None else stat_result.version
+        if version:
+            return {"VersionId": version}
+        if stat_result is not None and stat_result.etag:
+            return {"IfMatch": stat_result.etag}
+        return {}
 
-    def is_dir(self):
+    def _download(self, key, stat_result, f):
+        from botocore.exceptions import ClientError
+
+        kwargs = self._pinning(stat_result)
         try:
-            dir_key = to_dir_key(self.key)
-            res = self._client.head_object(Bucket=self.bucket, Key=dir_key)
-            return res["ContentLength"] == 0
+            res = self._client.get_object(Bucket=self.bucket, Key=key, **kwargs)
+        except ClientError as e:
+            raise FileNotFoundError(f"{self} has changed") from e
+        shutil.copyfileobj(res["Body"], f)
+
+    def _get_range(self, key, start, end, stat_result=None):
+        from botocore.exceptions import ClientError
+
+        kwargs = self._pinning(stat_result)
+        try:
+            res = self._client.get_object(
+                Bucket=self.bucket, Key=key, Range=f"bytes={start}-{end - 1}", **kwargs
+            )
+        except ClientError as e:
+            code = e.response["Error"]["Code"]
+            if code == "InvalidRange":
+                return b""
+            if code in {"NoSuchKey", "NoSuchVersion", "PreconditionFailed"}:
+                raise FileNotFoundError(f"No such file or directory: '{self}'") from e
+            raise
+        return res["Body"].read()
+
+    def _head(self, key, version=None):
+        from botocore.exceptions import ClientError
+
+        kwargs = {} if version is None else {"VersionId": version}
+        try:
+            res = self._client.head_object(Bucket=self.bucket, Key=key, **kwargs)
         except ClientError:
-            return False
+            return None
+        return file_stat(
+            res["ContentLength"],
+            res["LastModified"].timestamp(),
+            res.get("ETag"),
+            res.get("VersionId"),
+        )
+
+    def _list(self, prefix, max_keys):
+        from botocore.exceptions import ClientError
+
+        try:
+            res = self._client.list_objects_v2(
+                Bucket=self.bucket, Prefix=prefix, MaxKeys=max_keys
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "AccessDenied":
+                raise PermissionError(f"Permission denied: '{self}'") from e
+            raise
+        entries = [(c["Key"], _content_stat(c)) for c in res.get("Contents", [])]
+        return entries, res["IsTruncated"]
 
     def _exists(self, key) -> bool:
+        from botocore.exceptions import ClientError
+
         if key == "" or key == "/":
             return True
 
@@ -108,4 +207,6 @@ class S3Path(_SkeletonBlobPath, PureS3Path):
 
     @staticmethod
     def _create_client():
+        import boto3
+
         return boto3.client("s3")  # low-level client is thread safe
@@ -0,0 +1,162 @@
+import queue
+import string
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Characters keys are assumed to be spread over, in sorted order
+DEFAULT_ALPHABET = string.digits + string.ascii_uppercase + string.ascii_lowercase
+DEFAULT_MAX_WORKERS = 8
+# Entries per listing response of S3 and GCS unless asked otherwise
+SERVICE_PAGE_SIZE = 1000
+# More shards than workers keeps the workers busy when the shards are uneven
+SHARDS_PER_WORKER = 4
+# Sampling gives up descending into a shared key prefix after this many levels
+DEFAULT_MAX_DEPTH = 8
+# Pages a shard may list ahead of the consumer
+_QUEUE_PAGES = 4
+
+_Entry = Tuple[str, object]
+_Done = object()
+
+
+def split_keyspace(
+    prefix: str, shards: int, alphabet: str = DEFAULT_ALPHABET
+) -> List[str]:
+    # StartAfter boundaries splitting the keys below prefix into shards of
+    # equal size when the characters following prefix are uniform over alphabet
+    width = 1
+    while len(alphabet) ** width < shards:
+        width += 1
+    total = len(alphabet) ** width
+    boundaries = []
+    for i in range(1, shards):
+        n = total * i // shards
+        chars = []
+        for _ in range(width):
+            n, r = divmod(n, len(alphabet))
+            chars.append(alphabet[r])
+        boundaries.append(prefix + "".join(reversed(chars)))
+    return boundaries
+
+
+def sample_boundaries(
+    prefix: str,
+    shards: int,
+    first_key_after: Callable[[str], Optional[str]],
+    alphabet: str = DEFAULT_ALPHABET,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    max_depth: int = DEFAULT_MAX_DEPTH,
+) -> List[str]:
+    # Learns StartAfter boundaries by probing the first key after every
+    # alphabet character following prefix, and keeps the characters which
+    # start non-empty ranges. While all keys fall into a single range, which
+    # is common for dates and other shared prefixes, it descends a character
+    # deeper. Any boundaries partition the keys, so sampling only decides
+    # how even the shards are.
+    base = prefix
+    for _ in range(max_depth):
+        candidates = [base] + [base + c for c in alphabet]
+        with ThreadPoolExecutor(max(1, min(max_workers, len(candidates)))) as executor:
+            firsts = list(executor.map(first_key_after, candidates))
+
+        starts = []
+        for i, first in enumerate(firsts):
+            if first is None:
+                continue
+            if i + 1 < len(candidates) and candidates[i + 1] < first:
+                continue
+            starts.append(i)
+        if not starts:
+            return []
+        if 1 < len(starts):
+            # The first range needs no boundary of its own
+            picked = [
+                candidates[starts[len(starts) * i // shards]] for i in range(shards)
+            ]
+            return sorted(set(picked[1:]) - {candidates[starts[0]]})
+
+        first = firsts[starts[0]]
+        if first is None or len(first) <= len(base):
+            return []
+        base = first[: len(base) + 1]
+    return []
+
+
+def _shard_pages(
+    pages: Iterable[Sequence[_Entry]], start_after: str, end: Optional[str]
+) -> Iterator[List[_Entry]]:
+    # Keeps the entries in (start_after, end] in key order, as pages may hold
+    # prefixes and keys apart, and stops once a page passes end
+    for page in pages:
+        entries = sorted(
+            (e for e in page if start_after < e[0] and (end is None or e[0] <= end)),
+            key=lambda e: e[0],
+        )
+        if entries:
+            yield entries
+        if end is not None and any(end < e[0] for e in page):
+            break
+
+
+def list_shards(
+    boundaries: Sequence[str],
+    list_pages: Callable[[str], Iterable[Sequence[_Entry]]],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    ordered: bool = True,
+    start_after: str = "",
+) -> Iterator[List[_Entry]]:
+    # Lists the keys after start_after in the ranges between sorted boundaries
+    # on a thread pool with list_pages(start_after), which yields sorted pages
+    # of (key, stat).
+    # Ordered output yields the entries in key order, one shard after
+    # another, while later shards list ahead into bounded queues. Unordered
+    # output yields pages as soon as any shard has them.
+    boundaries = [b for b in boundaries if start_after < b]
+    starts = [start_after] + boundaries
+    ends: List[Optional[str]] = [*boundaries, None]
+    stop = threading.Event()
+    queues: List["queue.Queue"]
+    if ordered:
+        queues = [queue.Queue(_QUEUE_PAGES) for _ in starts]
+    else:
+        shared: "queue.Queue" = queue.Queue(_QUEUE_PAGES * len(starts))
+        queues = [shared] * len(starts)
+
+    def put(q, item):
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def work(i):
+        try:
+            for page in _shard_pages(list_pages(starts[i]), starts[i], ends[i]):
+                if not put(queues[i], page):
+                    return
+        except BaseException as e:
+            put(queues[i], e)
+            return
+        put(queues[i], _Done)
+
+    executor = ThreadPoolExecutor(max(1, min(max_workers, len(starts))))
+    try:
+        for i in range(len(starts)):
+            executor.submit(work, i)
+
+        done = 0
+        while done < len(starts):
+            # Unordered shards share a single queue
+            item = queues[done if ordered else 0].get()
+            if item is _Done:
+                done += 1
+            elif isinstance(item, BaseException):
+                raise item
+            else:
+                yield item
+    finally:
+        stop.set()
+        executor.shutdown(wait=True)
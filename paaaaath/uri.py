@@ -1,13 +1,77 @@
 import fnmatch
+import functools
 import pathlib
 import posixpath
 import re
+import sys
 from os import fsencode
-from typing import List
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from urllib.parse import quote_from_bytes, urlparse
 
 from paaaaath.common import PurePath
 
+DEFAULT_PARSE_CACHE_SIZE = 4096
+
+
+def _split_uri(part: str, sep: str) -> Tuple[str, str, str]:
+    url = urlparse(part)
+    scheme = url.scheme
+    netloc = url.netloc
+    path = url.path
+
+    if scheme == "" and netloc != "":
+        path = f"{sep}{netloc}{sep}{path}".rstrip(sep)
+        netloc = ""
+
+    drv = "" if scheme == "" else f"{scheme}://{netloc}"
+    part = path.lstrip("/")
+    root = sep if drv != "" or path != part else ""
+    return drv, root, part
+
+
+def _parse_parts(flavour: "_UriFlavour", parts: Sequence[str]):
+    drv, root, parsed = pathlib._Flavour.parse_parts(flavour, parts)  # type: ignore
+    if drv or root:
+        # share drive and anchor strings between paths of the same bucket/host
+        drv = sys.intern(drv)
+        parsed[0] = sys.intern(parsed[0])
+    return drv, root, parsed
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_pattern(pattern: str):
+    # glob() matches every listed name against the same few patterns
+    return re.compile(fnmatch.translate(pattern)).fullmatch
+
+
+# LRU caches shared by every _UriFlavour, installed by enable_parse_cache()
+_cached_split_uri: Optional[Any] = None
+_cached_parse_parts: Optional[Any] = None
+
+
+def enable_parse_cache(maxsize: int = DEFAULT_PARSE_CACHE_SIZE) -> None:
+    global _cached_split_uri, _cached_parse_parts
+    if maxsize <= 0:
+        raise ValueError(f"maxsize must be positive. but {maxsize} was given.")
+
+    _cached_split_uri = functools.lru_cache(maxsize)(_split_uri)
+    _cached_parse_parts = functools.lru_cache(maxsize)(_parse_parts)
+
+
+def disable_parse_cache() -> None:
+    global _cached_split_uri, _cached_parse_parts
+    _cached_split_uri = None
+    _cached_parse_parts = None
+
+
+def parse_cache_info() -> Dict[str, Any]:
+    if _cached_split_uri is None or _cached_parse_parts is None:
+        return {}
+    return {
+        "splitroot": _cached_split_uri.cache_info(),
+        "parse_parts": _cached_parse_parts.cache_info(),
+    }
+
 
 class _UriFlavour(pathlib._Flavour):  # type: ignore
     sep = "/"
@@ -19,24 +83,23 @@ class _UriFlavour(pathlib._Flavour):  # type: ignore
     is_supported = True
 
     def splitroot(self, part, sep=sep):
-        url = urlparse(part)
-        scheme = url.scheme
-        netloc = url.netloc
-        path = url.path
-
-        if scheme == "" and netloc != "":
-            path = f"{sep}{netloc}{sep}{path}".rstrip(sep)
-            netloc = ""
-
-        drv = "" if scheme == "" else f"{scheme}://{netloc}"
-        part = path.lstrip("/")
-        root = sep if drv != "" or path != part else ""
+        if _cached_split_uri is None:
+            drv, root, part = _split_uri(part, sep)
+        else:
+            drv, root, part = _cached_split_uri(part, sep)
 
         has_unknown_scheme = not any(drv.startswith(f"{s}://") for s in self.schemes)
         if drv != "" and (0 < len(self.schemes) and has_unknown_scheme):
             raise ValueError(f"http and https are only supported. but {drv} was given.")
         return drv, root, part
 
+    def parse_parts(self, parts):
+        if _cached_parse_parts is None:
+            return _parse_parts(self, parts)
+
+        drv, root, parsed = _cached_parse_parts(self, tuple(parts))
+        return drv, root, list(parsed)
+
     def casefold(self, s):
         return s
 
@@ -44,7 +107,7 @@ class _UriFlavour(pathlib._Flavour):  # type: ignore
         return parts
 
     def compile_pattern(self, pattern):
-        return re.compile(fnmatch.translate(pattern)).fullmatch
+        return _compile_pattern(pattern)
 
     def resolve(self, path, strict=False):
         norm_path = posixpath.normpath(self.join(path.parts[1:]))
@@ -11,6 +11,9 @@ from google.cloud import storage
 
 
 class Bucket(ABC):
+    # API requests sent through the client since the bucket was created
+    requests: list
+
     def put(self, key, content):
         ...
 
@@ -77,6 +80,15 @@ def gcsbucket():
             self.name = name
             self._client = client
             self._client.create_bucket(name)
+            self.requests = []
+
+            request = client._http.request
+
+            def _record(method, url, *args, **kwargs):
+                self.requests.append(f"{method} {url}")
+                return request(method, url, *args, **kwargs)
+
+            client._http.request = _record
 
         def put(self, key, content=""):
             self._client.get_bucket(self.name).blob(key).upload_from_string(content)
@@ -109,6 +121,12 @@ def s3bucket():
             self.name = name
             self._client = client
             self._client.create_bucket(Bucket=name)
+            self.requests = []
+
+            def _record(model, **kwargs):
+                self.requests.append(model.name)
+
+            client.meta.events.register("before-call.s3", _record)
 
         def put(self, key, content=b""):
             self._client.put_object(Bucket=self.name, Body=content, Key=key)
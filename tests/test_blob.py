@@ -1,3 +1,6 @@
+import pickle
+import sys
+
 import pytest
 from paaaaath.gcs import GCSPath, PureGCSPath, _gcs_flavour
 from paaaaath.s3 import PureS3Path, S3Path, _s3_flavour
@@ -113,3 +116,85 @@ def test_gethome_fail(cls):
 def test_samefile_fail(cls, scheme):
     uri = f"{scheme}://example/a"
     cls(uri).samefile(cls(uri))
+
+
+@pytest.mark.parametrize(["cls", "scheme"], [(S3Path, "s3"), (GCSPath, "gs")])
+@pytest.mark.parametrize(
+    ["parent", "key", "expect"],
+    [
+        ("{}://bucket", "a", "{}://bucket/a"),
+        ("{}://bucket/", "a/", "{}://bucket/a"),
+        ("{}://bucket/a/b", "c.txt", "{}://bucket/a/b/c.txt"),
+        ("{}://bucket/a", "b//./c/", "{}://bucket/a/b/c"),
+    ],
+)
+def test_make_child_key(cls, scheme, parent, key, expect):
+    child = cls(parent.format(scheme))._make_child_key(key)
+
+    assert type(child) is cls
+    assert child == cls(expect.format(scheme))
+    assert child.parts == cls(expect.format(scheme)).parts
+
+
+@pytest.mark.parametrize(["cls", "scheme"], [(S3Path, "s3"), (GCSPath, "gs")])
+def test_bucket_and_drive_are_shared(cls, scheme):
+    a = cls(f"{scheme}://bucket/a")
+    b = cls(f"{scheme}://bucket", "b")
+
+    assert a.drive is b.drive
+    assert a.parts[0] is b.parts[0]
+    assert a.bucket is b.bucket
+
+
+@pytest.mark.parametrize(["cls", "scheme"], [(S3Path, "s3"), (GCSPath, "gs")])
+def test_key_is_cached(cls, scheme):
+    p = cls(f"{scheme}://bucket/a/b")
+
+    assert p.key is p.key
+
+
+@pytest.mark.skipif(
+    sys.version_info < (3, 10), reason="pathlib.Path has its own slots before 3.10"
+)
+@pytest.mark.parametrize(
+    ["cls", "scheme"], [(S3Path, "s3"), (GCSPath, "gs"), (PureS3Path, "s3")]
+)
+def test_has_no_instance_dict(cls, scheme):
+    assert not hasattr(cls(f"{scheme}://bucket/a"), "__dict__")
+
+
+@pytest.mark.parametrize(
+    ["cls", "uri", "expect"],
+    [
+        (S3Path, "s3://bucket/a/b?versionId=v1", "v1"),
+        (PureS3Path, "s3://bucket/a?versionId=v1&x=y", "v1"),
+        (S3Path, "s3://bucket/a?generation=1", None),
+        (GCSPath, "gs://bucket/a?generation=12", "12"),
+        (PureGCSPath, "gs://bucket/a", None),
+        (GCSPath, "gs://bucket/?generation=12", None),
+    ],
+)
+def test_version_from_uri(cls, uri, expect):
+    p = cls(uri)
+
+    assert p.version == expect
+    assert str(p) == uri.split("?")[0]
+
+
+@pytest.mark.parametrize(
+    ["cls", "scheme", "query"],
+    [(S3Path, "s3", "versionId"), (GCSPath, "gs", "generation")],
+)
+def test_at_version(cls, scheme, query):
+    p = cls(f"{scheme}://bucket/a/b")
+    pinned = p.at_version(12)
+
+    assert pinned.version == "12"
+    assert pinned == cls(f"{scheme}://bucket/a/b?{query}=12")
+    assert hash(pinned) == hash(cls(f"{scheme}://bucket/a/b?{query}=12"))
+    assert pinned != p and pinned != p.at_version(13)
+    assert repr(pinned) == f"{cls.__name__}('{scheme}://bucket/a/b?{query}=12')"
+    assert pickle.loads(pickle.dumps(pinned)).version == "12"
+    assert pinned.parent.version is None and (pinned / "c").version is None
+    with pytest.raises(ValueError):
+        cls(f"{scheme}://bucket/").at_version(12)
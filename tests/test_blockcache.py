@@ -0,0 +1,94 @@
+import io
+
+import pytest
+from paaaaath import blockcache
+from paaaaath.blockcache import BlockCache, BlockCacheInfo, BlockReader
+
+DATA = bytes(range(100))
+
+
+@pytest.fixture
+def fetches():
+    return []
+
+
+@pytest.fixture
+def fetch(fetches):
+    def _fetch(start, end):
+        fetches.append((start, end))
+        return DATA[start:end]
+
+    return _fetch
+
+
+@pytest.mark.parametrize(
+    ["offset", "length", "expect"],
+    [
+        (0, 10, [(0, 10)]),
+        (5, 10, [(0, 20)]),
+        (95, 10, [(90, 100)]),
+        (100, 10, []),
+        (0, 0, []),
+    ],
+)
+def test_read(fetch, fetches, offset, length, expect):
+    cache = BlockCache(10, 1000, 1000)
+
+    assert (
+        cache.read(("s3://b", "k", "1"), 100, offset, length, fetch)
+        == DATA[offset : offset + length]
+    )
+    assert fetches == expect
+
+
+def test_read_fetches_missing_runs(fetch, fetches):
+    cache = BlockCache(10, 1000, 1000)
+    cache.read(("s3://b", "k", "1"), 100, 20, 10, fetch)
+    cache.read(("s3://b", "k", "1"), 100, 50, 10, fetch)
+    fetches.clear()
+
+    assert cache.read(("s3://b", "k", "1"), 100, 0, 80, fetch) == DATA[:80]
+    assert fetches == [(0, 20), (30, 50), (60, 80)]
+    assert cache.info() == BlockCacheInfo(2, 8, 0, 1000, 80)
+
+
+def test_eviction(fetch):
+    cache = BlockCache(10, 40, 20)
+    for key in ["a", "b"]:
+        for offset in [0, 10, 20]:
+            cache.read(("s3://b", key, "1"), 100, offset, 10, fetch)
+    cache.read(("s3://b", "c", "1"), 100, 0, 10, fetch)
+
+    info = cache.info()
+    assert (info.evictions, info.currbytes) == (3, 40)
+    assert cache.read(("s3://b", "a", "1"), 100, 0, 10, fetch) == DATA[:10]
+    assert cache.info().misses == 8
+
+
+@pytest.mark.parametrize("args", [(0, 10, 10), (10, 0, 10), (10, 10, 0), (-1, 10, 10)])
+def test_invalid_size(args):
+    with pytest.raises(ValueError):
+        BlockCache(*args)
+
+
+def test_block_reader(fetch, fetches):
+    cache = BlockCache(10, 1000, 1000)
+    raw = BlockReader(
+        "s3://b/k", 100, lambda o, n: cache.read(("s3://b", "k", "1"), 100, o, n, fetch)
+    )
+    f = io.BufferedReader(raw, buffer_size=4)
+
+    assert f.seek(-8, io.SEEK_END) == 92
+    assert f.read(4) == DATA[92:96]
+    f.seek(10)
+    assert f.read(3) == DATA[10:13]
+    assert f.read() == DATA[13:]
+    assert f.read() == b""
+    assert fetches == [(90, 100), (10, 20), (20, 90)]
+
+
+def test_enable_disable():
+    blockcache.enable_block_cache(16, 1024, 256)
+    assert blockcache.block_cache_info() == BlockCacheInfo(0, 0, 0, 1024, 0)
+    blockcache.disable_block_cache()
+    assert blockcache.block_cache_info() is None
@@ -0,0 +1,122 @@
+import io
+import json
+
+import pytest
+from paaaaath import ExistenceIndex, GCSPath, S3Path
+from paaaaath.bloom import BloomFilter
+
+
+def test_bloom_filter():
+    bloom_filter = BloomFilter(1000, 0.01)
+    for i in range(1000):
+        bloom_filter.add(f"in/{i}")
+
+    assert all(f"in/{i}" in bloom_filter for i in range(1000))
+    false_positives = sum(f"out/{i}" in bloom_filter for i in range(10000))
+    assert false_positives < 300
+    assert bloom_filter.error_rate == pytest.approx(0.01, rel=0.2)
+
+
+@pytest.mark.parametrize(["error_rate"], [(0.0,), (1.0,), (-0.5,)])
+def test_bloom_filter_fail(error_rate):
+    with pytest.raises(ValueError):
+        BloomFilter(10, error_rate)
+
+
+def _index(prefix, paths):
+    index = ExistenceIndex(S3Path(prefix), BloomFilter(len(paths) * 4))
+    index.update(paths)
+    return index
+
+
+@pytest.mark.parametrize(
+    ["pathstr", "expect"],
+    [
+        ("s3://bucket/prefix/a/b", True),
+        ("s3://bucket/prefix/a", True),
+        ("s3://bucket/prefix/c", True),
+        ("s3://bucket/other/c", False),
+        ("s3://bucket/prefix", False),
+        ("s3://other/prefix/c", False),
+        ("gs://bucket/prefix/c", False),
+    ],
+)
+def test_existence_index_covers(pathstr, expect):
+    index = _index("s3://bucket/prefix", [])
+    assert (
+        index.covers(S3Path(pathstr) if "s3" in pathstr else GCSPath(pathstr)) == expect
+    )
+
+
+def test_existence_index_contains():
+    index = _index("s3://bucket/prefix", ["s3://bucket/prefix/a/b/c"])
+
+    assert S3Path("s3://bucket/prefix/a/b/c") in index
+    assert S3Path("s3://bucket/prefix/a/b/") in index
+    assert S3Path("s3://bucket/prefix/a") in index
+    assert S3Path("s3://bucket/prefix/a/b/d") not in index
+
+
+def test_existence_index_grows():
+    index = ExistenceIndex(S3Path("s3://bucket/prefix"), BloomFilter(100, 0.005))
+    paths = [f"s3://bucket/prefix/in/{i}" for i in range(5000)]
+    index.update(paths)
+
+    assert all(S3Path(p) in index for p in paths)
+    assert 1 < len(index._filters)
+    assert index.error_rate < 0.01
+    false_positives = sum(
+        S3Path(f"s3://bucket/prefix/out/{i}") in index for i in range(10000)
+    )
+    assert false_positives < 150
+
+
+def test_existence_index_update_again():
+    paths = [f"s3://bucket/prefix/dir/{i}" for i in range(100)]
+    index = _index("s3://bucket/prefix", paths)
+    count = sum(f.count for f in index._filters)
+    index.update(paths)
+
+    # The keys and their shared parent "dir"
+    assert count == 101
+    assert sum(f.count for f in index._filters) == count
+
+
+def test_existence_index_save_load():
+    paths = [f"s3://bucket/prefix/{i}" for i in range(100)]
+    index = _index("s3://bucket/prefix", paths)
+    f = io.BytesIO()
+    index.save(f)
+    f.seek(0)
+
+    loaded = ExistenceIndex.load(f)
+    assert loaded.prefix == index.prefix
+    assert loaded.error_rate == index.error_rate
+    assert all(S3Path(p) in loaded for p in paths)
+
+
+def test_existence_index_load_v1():
+    bloom_filter = BloomFilter(10)
+    bloom_filter.add("prefix/a")
+    header = {
+        "prefix": "s3://bucket/prefix",
+        "num_bits": bloom_filter.num_bits,
+        "num_hashes": bloom_filter.num_hashes,
+        "count": bloom_filter.count,
+    }
+    f = io.BytesIO(
+        b"PAAAAATH-BLOOM-1\n"
+        + json.dumps(header).encode("utf-8")
+        + b"\n"
+        + bytes(bloom_filter._bits)
+    )
+
+    loaded = ExistenceIndex.load(f)
+    assert S3Path("s3://bucket/prefix/a") in loaded
+    loaded.update(["s3://bucket/prefix/b"])
+    assert S3Path("s3://bucket/prefix/b") in loaded
+
+
+def test_existence_index_load_fail():
+    with pytest.raises(ValueError):
+        ExistenceIndex.load(io.BytesIO(b"not an index\n"))
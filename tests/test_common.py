@@ -47,6 +47,7 @@ class FakePath:
         ("https://example.com", PureHttpPath),
         ("http://example.com:80/index.html", PureHttpPath),
         ("s3://example.com", PureS3Path),
+        ("ftp://example.com", PureUriPath),
         ("/example.com", PureWindowsPath if os.name == "nt" else PurePosixPath),
     ],
 )
@@ -55,6 +56,23 @@ def test_create_purepath(uri, cls):
     assert isinstance(path, cls)
 
 
+@pytest.mark.parametrize(
+    ["args", "cls", "expect"],
+    [
+        (("s3://bucket", "a/b"), PureS3Path, "s3://bucket/a/b"),
+        (("a", "s3://bucket/b"), PureS3Path, "s3://bucket/b"),
+        (("s3://bucket/a", "/b"), PureS3Path, "s3://bucket/b"),
+        ((PureS3Path("s3://bucket/a"), "b"), PureS3Path, "s3://bucket/a/b"),
+        (("gs://bucket", "s3://other/b"), PureS3Path, "s3://other/b"),
+        (("/a", "b"), PureWindowsPath if os.name == "nt" else PurePosixPath, "/a/b"),
+    ],
+)
+def test_create_purepath_from_multiple_args(args, cls, expect):
+    path = PurePath(*args)
+    assert type(path) is cls
+    assert path == cls(expect)
+
+
 @pytest.mark.parametrize(
     ["uri", "cls"],
     [
@@ -62,6 +80,7 @@ def test_create_purepath(uri, cls):
         ("https://example.com", HttpPath),
         ("http://example.com:80/index.html", HttpPath),
         ("s3://example.com", S3Path),
+        ("ftp://example.com", WindowsPath if os.name == "nt" else PosixPath),
         ("/example.com", WindowsPath if os.name == "nt" else PosixPath),
     ],
 )
@@ -776,6 +795,47 @@ def test_pickling(pure_path_cls):
         assert str(pp) == str(p)
 
 
+@pytest.mark.parametrize(
+    ["uri"],
+    [
+        ("s3://bucket/a/b",),
+        ("s3://bucket",),
+        ("https://example.com/a/b.html",),
+        ("ftp://example.com/a",),
+        ("/a/b",),
+        ("a/b",),
+        ("",),
+    ],
+)
+@pytest.mark.parametrize(["cls"], [(PurePath,), (Path,)])
+def test_pickling_uri(cls, uri):
+    p = cls(uri)
+    for proto in range(0, pickle.HIGHEST_PROTOCOL + 1):
+        pp = pickle.loads(pickle.dumps(p, proto))
+        assert pp.__class__ is p.__class__
+        assert pp == p
+        assert pp.parts == p.parts
+        assert str(pp) == str(p)
+
+
+def test_pickling_shares_drive():
+    paths = pickle.loads(
+        pickle.dumps([S3Path("s3://bucket/a"), S3Path("s3://bucket/b")])
+    )
+    assert paths[0].drive is paths[1].drive
+    assert paths[0].parts[0] is paths[1].parts[0]
+
+
+@pytest.mark.parametrize(["stream"], [(False,), (True,)])
+def test_exists_many_local(tmp_path, stream):
+    (tmp_path / "file").touch()
+    paths = [tmp_path / "file", tmp_path, tmp_path / "missing" / "file"]
+
+    results = dict(Path.exists_many(map(str, paths), stream=stream))
+    assert results == {Path(p): p.exists() for p in paths}
+    assert list(results.values()) == [True, True, False]
+
+
 @pytest.mark.parametrize(["pure_path_cls"], pure_path_classes)
 @pytest.mark.parametrize(
     ["left_hand", "right_hand", "expect"],
@@ -0,0 +1,104 @@
+import multiprocessing
+import os
+
+import pytest
+from paaaaath import contentcache
+from paaaaath.contentcache import ContentCache, ContentCacheInfo
+
+
+def _writer(content):
+    return lambda f: f.write(content)
+
+
+def test_get_put(tmp_path):
+    cache = ContentCache(str(tmp_path), 16)
+    assert cache.get(("s3://bucket", "file", "etag")) is None
+
+    path = cache.put(("s3://bucket", "file", "etag"), _writer(b"abc"))
+    assert cache.get(("s3://bucket", "file", "etag")) == path
+    assert cache.get(("s3://bucket", "file", "other")) is None
+    with open(path, "rb") as f:
+        assert f.read() == b"abc"
+
+    info = cache.info()
+    assert info == ContentCacheInfo(1, 2, 0, 16, 3)
+    assert info.hit_rate == pytest.approx(1 / 3)
+
+
+def test_lru_eviction(tmp_path):
+    cache = ContentCache(str(tmp_path), 10)
+    for i, key in enumerate(["a", "b", "c"]):
+        path = cache.put(("s3://bucket", key, "1"), _writer(b"abc"))
+        os.utime(path, (i, i))
+    cache.get(("s3://bucket", "a", "1"))
+    cache.put(("s3://bucket", "d", "1"), _writer(b"abc"))
+
+    assert cache.get(("s3://bucket", "a", "1")) is not None
+    assert cache.get(("s3://bucket", "b", "1")) is None
+    assert cache.get(("s3://bucket", "c", "1")) is not None
+    assert cache.get(("s3://bucket", "d", "1")) is not None
+    assert cache.info().evictions == 1
+    assert cache.info().currbytes == 9
+
+
+def test_scans_only_when_full(tmp_path, monkeypatch):
+    cache = ContentCache(str(tmp_path), 100)
+    scans = []
+    scandir = os.scandir
+    monkeypatch.setattr(
+        contentcache.os, "scandir", lambda path: scans.append(1) or scandir(path)
+    )
+
+    for i in range(40):
+        cache.put(("s3://bucket", str(i), "1"), _writer(b"abcd"))
+    # The first put, the 26th exceeding 100 bytes, and then every 4th put as
+    # the eviction leaves 88 bytes
+    assert len(scans) == 5
+    assert cache.info().currbytes <= 100
+
+
+def test_failed_write_leaves_nothing(tmp_path):
+    def _fail(f):
+        f.write(b"ab")
+        raise OSError("broken")
+
+    cache = ContentCache(str(tmp_path), 16)
+    with pytest.raises(OSError):
+        cache.put(("s3://bucket", "file", "1"), _fail)
+    assert os.listdir(tmp_path) == []
+
+
+def test_invalid_max_bytes(tmp_path):
+    with pytest.raises(ValueError):
+        ContentCache(str(tmp_path), 0)
+
+
+def _put_entries(directory, keys):
+    cache = ContentCache(directory)
+    for key in keys:
+        cache.put(("gs://bucket", key, "1"), _writer(key.encode()))
+
+
+def test_shared_between_processes(tmp_path):
+    workers = [
+        multiprocessing.Process(target=_put_entries, args=(str(tmp_path), ["a", "b"]))
+        for _ in range(4)
+    ]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    assert all(w.exitcode == 0 for w in workers)
+
+    cache = ContentCache(str(tmp_path))
+    path = cache.get(("gs://bucket", "b", "1"))
+    with open(path, "rb") as f:
+        assert f.read() == b"b"
+    assert cache.info().currbytes == 2
+
+
+def test_enable_disable(tmp_path):
+    contentcache.enable_content_cache(str(tmp_path / "cache"), 1024)
+    assert contentcache.content_cache_info() == ContentCacheInfo(0, 0, 0, 1024, 0)
+    contentcache.disable_content_cache()
+    assert contentcache.content_cache_info() is None
@@ -1,10 +1,17 @@
 import collections
 import io
+import stat
 import time
-import sys
 
 import pytest
-from paaaaath import GCSPath
+from paaaaath import (
+    ExistenceIndex,
+    GCSPath,
+    Path,
+    blockcache,
+    contentcache,
+    metacache,
+)
 
 
 @pytest.mark.parametrize(
@@ -15,6 +22,7 @@ from paaaaath import GCSPath
         ("foo", "foo/", True),
         ("foo/", "foo/", True),
         ("foo", "bar", False),
+        ("foo/bar", "foo", True),
     ],
 )
 def test_exists(gcsbucket, putstr, pathstr, expect):
@@ -179,17 +187,7 @@ def test_is_dir(gcsbucket, key, content, expect):
     [
         ("home", []),
         ("samefile", [GCSPath("gs://other/abc")]),
-        ("glob", ["*.py"]),
-        ("rglob", ["*.py"]),
         ("absolute", []),
-        pytest.param(
-            "stat",
-            [],
-            marks=pytest.mark.skipif(
-                (3, 10) <= sys.version_info,
-                reason="python 3.10 require stat implementation",
-            ),
-        ),
         ("owner", []),
         ("readlink", []),
         ("chmod", [0x666]),
@@ -201,7 +199,6 @@ def test_is_dir(gcsbucket, key, content, expect):
         ("rename", [GCSPath("gs://tmp")]),
         ("replace", [GCSPath("gs://tmp")]),
         ("symlink_to", [GCSPath("gs://tmp")]),
-        ("is_file", []),
         ("expanduser", []),
     ],
 )
@@ -223,3 +220,569 @@ def test_path_public_api_fail(api_name, args):
 )
 def test_path_predicate(api_name):
     assert getattr(GCSPath("gs://example/com"), api_name)() == False
+
+
+def test_stat(gcsbucket):
+    gcsbucket.put("file", "abc")
+    st = GCSPath(f"{gcsbucket.root}/file").stat()
+    blob = gcsbucket.get("file")
+
+    assert stat.S_ISREG(st.st_mode)
+    assert st.st_size == 3
+    assert st.st_mtime == blob.updated.timestamp()
+    assert st.etag == blob.etag
+    assert st.version == str(blob.generation)
+
+
+@pytest.mark.parametrize(["key"], [("dir/",), ("",)])
+def test_stat_dir(gcsbucket, key):
+    gcsbucket.put("dir/")
+    st = GCSPath(f"{gcsbucket.root}/{key}").stat()
+
+    assert stat.S_ISDIR(st.st_mode)
+
+
+def test_stat_fail(gcsbucket):
+    with pytest.raises(FileNotFoundError):
+        GCSPath(f"{gcsbucket.root}/file").stat()
+
+
+@pytest.mark.parametrize(
+    ["key", "content", "pathstr", "expect"],
+    [
+        ("key", "abc", "key", True),
+        ("key/", "", "key", False),
+        ("key", "abc", "other", False),
+        ("key", "abc", "", False),
+    ],
+)
+def test_is_file(gcsbucket, key, content, pathstr, expect):
+    gcsbucket.put(key, content)
+    assert GCSPath(f"{gcsbucket.root}/{pathstr}").is_file() == expect
+
+
+@pytest.mark.parametrize(
+    ["key", "expect", "requests"],
+    [("file", (True, True, False), 1), ("dir/", (True, False, True), 1)],
+)
+def test_predicates_after_stat(gcsbucket, key, expect, requests):
+    gcsbucket.put(key)
+    p = GCSPath(f"{gcsbucket.root}/{key}")
+
+    gcsbucket.requests.clear()
+    p.stat()
+    assert (p.exists(), p.is_file(), p.is_dir()) == expect
+    assert len(gcsbucket.requests) == requests
+
+
+def test_check_file_with_one_request(gcsbucket):
+    gcsbucket.put("file")
+    p = GCSPath(f"{gcsbucket.root}/file")
+
+    gcsbucket.requests.clear()
+    assert p.exists() and p.is_file() and not p.is_dir()
+    assert len(gcsbucket.requests) == 1
+
+
+def test_write_forgets_stat(gcsbucket):
+    p = GCSPath(f"{gcsbucket.root}/file")
+    p.write_bytes(b"abc")
+    assert p.stat().st_size == 3
+    p.write_bytes(b"abcdef")
+    assert p.stat().st_size == 6
+    assert p.is_file()
+
+
+def test_scandir(gcsbucket):
+    gcsbucket.put("dir/file", b"abc")
+    gcsbucket.put("dir/sub/")
+    entries = sorted(GCSPath(f"{gcsbucket.root}/dir").scandir(), key=lambda e: e.name)
+
+    assert [e.name for e in entries] == ["file", "sub"]
+    assert [e.path for e in entries] == [
+        str(GCSPath(f"{gcsbucket.root}/dir/file")),
+        str(GCSPath(f"{gcsbucket.root}/dir/sub")),
+    ]
+    assert [(e.is_file(), e.is_dir(), e.is_symlink()) for e in entries] == [
+        (True, False, False),
+        (False, True, False),
+    ]
+    assert entries[0].stat().st_size == 3
+
+
+# Without implicit_dirs the listing cannot tell if "sub/" has a marker
+@pytest.mark.parametrize(["implicit", "requests"], [(True, 1), (False, 3)])
+@pytest.mark.parametrize(["method"], [("iterdir",), ("scandir",)])
+def test_listing_metadata_without_request(
+    gcsbucket, monkeypatch, method, implicit, requests
+):
+    monkeypatch.setattr(GCSPath, "implicit_dirs", implicit)
+    gcsbucket.put("dir/file", b"abc")
+    gcsbucket.put("dir/sub/")
+
+    gcsbucket.requests.clear()
+    sizes = {
+        c.name: (c.is_file(), c.is_dir(), c.stat().st_size)
+        for c in getattr(GCSPath(f"{gcsbucket.root}/dir"), method)()
+    }
+    assert sizes == {"file": (True, False, 3), "sub": (False, True, 0)}
+    assert len(gcsbucket.requests) == requests
+
+
+@pytest.mark.parametrize(
+    ["keys", "expect", "requests"],
+    [
+        ([], False, 1),
+        (["foo"], True, 1),
+        (["foo/"], True, 1),
+        (["foo/bar"], True, 1),
+        (["foo.txt", "foo/bar"], True, 1),
+        (["foo-a", "foo-b", "foo/bar"], True, 2),
+        (["foo-a", "foo-b", "foo-c"], False, 2),
+    ],
+)
+def test_exists_requests(gcsbucket, keys, expect, requests):
+    for key in keys:
+        gcsbucket.put(key)
+    p = GCSPath(f"{gcsbucket.root}foo")
+
+    gcsbucket.requests.clear()
+    assert p.exists() == expect
+    # fake-gcs-server ignores maxResults, so siblings never spill into a second page
+    assert 1 <= len(gcsbucket.requests) <= requests
+
+
+def test_stat_many_by_listing(gcsbucket):
+    for i in range(20):
+        gcsbucket.put(f"dir/{i:02d}", b"abc")
+    gcsbucket.put("dir/sub/file")
+    paths = [GCSPath(f"{gcsbucket.root}dir/{i:02d}") for i in range(20)]
+    paths += [
+        GCSPath(f"{gcsbucket.root}dir/sub"),
+        GCSPath(f"{gcsbucket.root}dir/missing"),
+    ]
+
+    gcsbucket.requests.clear()
+    counters = {}
+    results = Path.stat_many(paths, counters=counters)
+    assert [results[p] and results[p].st_size for p in paths] == [3] * 20 + [0, None]
+    assert stat.S_ISDIR(results[paths[20]].st_mode)
+    assert counters == {"list": 1}
+    # Implicit directories are not remembered without implicit_dirs
+    assert all(p.exists() for p in paths[:20])
+    assert len(gcsbucket.requests) == 1
+
+
+def test_exists_many_by_probes(gcsbucket):
+    gcsbucket.put("a/file")
+    gcsbucket.put("b/dir/")
+    paths = [
+        f"{gcsbucket.root}a/file",
+        f"{gcsbucket.root}b/dir",
+        f"{gcsbucket.root}c/missing",
+    ]
+
+    gcsbucket.requests.clear()
+    counters = {}
+    results = dict(Path.exists_many(paths, stream=True, counters=counters))
+    assert results == {
+        GCSPath(paths[0]): True,
+        GCSPath(paths[1]): True,
+        GCSPath(paths[2]): False,
+    }
+    assert counters == {"probe": 3}
+    assert len(gcsbucket.requests) == 3
+
+
+@pytest.fixture
+def existence_index(gcsbucket):
+    for key in ["prefix/a", "prefix/dir/b", "other"]:
+        gcsbucket.put(key)
+    index = ExistenceIndex.build(f"{gcsbucket.root}prefix")
+    GCSPath.register_existence_index(index)
+    yield index
+    GCSPath.unregister_existence_index(index)
+
+
+@pytest.mark.parametrize(
+    ["pathstr", "expect", "requests"],
+    [
+        ("prefix/a", True, 1),
+        ("prefix/dir", True, 1),
+        ("prefix/missing", False, 0),
+        ("prefix/dir/missing", False, 0),
+        ("other", True, 1),
+        ("missing", False, 1),
+    ],
+)
+def test_exists_with_existence_index(
+    gcsbucket, existence_index, pathstr, expect, requests
+):
+    p = GCSPath(f"{gcsbucket.root}{pathstr}")
+
+    gcsbucket.requests.clear()
+    assert p.exists() == expect
+    assert len(gcsbucket.requests) == requests
+
+
+def test_write_updates_existence_index(gcsbucket, existence_index):
+    p = GCSPath(f"{gcsbucket.root}prefix/new/file")
+    assert not p.exists()
+
+    p.write_bytes(b"abc")
+    assert p.exists()
+    assert GCSPath(f"{gcsbucket.root}prefix/new").exists()
+
+
+def test_update_existence_index(gcsbucket, existence_index):
+    gcsbucket.put("prefix/late")
+    p = GCSPath(f"{gcsbucket.root}prefix/late")
+    assert not p.exists()
+
+    existence_index.update()
+    assert p.exists()
+
+
+@pytest.mark.parametrize(
+    ["keys", "op", "requests"],
+    [
+        (["dir/", "dir/file"], lambda p: p.touch(), 2),
+        (["dir/"], lambda p: p.touch(), 3),
+        (["dir/"], lambda p: p.mkdir(), 3),
+        (["dir/", "dir/file"], lambda p: p.is_file(), 1),
+        (["dir/", "dir/file"], lambda p: list(p.parent.iterdir()), 1),
+    ],
+    ids=["touch_existing", "touch", "mkdir", "is_file", "iterdir"],
+)
+def test_requests_per_operation(gcsbucket, keys, op, requests):
+    for key in keys:
+        gcsbucket.put(key)
+    p = GCSPath(f"{gcsbucket.root}dir/file")
+
+    gcsbucket.requests.clear()
+    op(p)
+    assert len(gcsbucket.requests) == requests
+    # bucket handles are reused instead of fetched by get_bucket()
+    assert not any(r.split("?")[0].endswith(gcsbucket.name) for r in gcsbucket.requests)
+
+
+@pytest.mark.parametrize(["page_size", "expect"], [(None, 0), (2, 1)])
+def test_iterdir_listing_query(gcsbucket, page_size, expect):
+    gcsbucket.put("dir/a")
+
+    gcsbucket.requests.clear()
+    list(GCSPath(f"{gcsbucket.root}dir").iterdir(page_size=page_size))
+    assert "fields=items" in gcsbucket.requests[0]
+    assert gcsbucket.requests[0].count("maxResults=2") == expect
+
+
+@pytest.mark.parametrize(
+    ["prepare", "read", "expect", "requests"],
+    [
+        (lambda p: None, lambda p: p.read_bytes(), b"abc", 1),
+        (lambda p: p.stat(), lambda p: p.read_bytes(), b"abc", 1),
+        (lambda p: None, lambda p: p.read_text(), "abc", 2),
+        (lambda p: p.stat(), lambda p: p.read_text(), "abc", 1),
+        (lambda p: p.stat(), lambda p: p.open("rb").read(2), b"ab", 1),
+    ],
+    ids=["read_bytes", "read_bytes_stat", "read_text", "read_text_stat", "open_stat"],
+)
+def test_read_with_known_metadata(gcsbucket, prepare, read, expect, requests):
+    gcsbucket.put("file", b"abc")
+    p = GCSPath(f"{gcsbucket.root}file")
+    prepare(p)
+
+    gcsbucket.requests.clear()
+    assert read(p) == expect
+    assert len(gcsbucket.requests) == requests
+
+
+def test_read_listed_objects_with_one_request_each(gcsbucket):
+    for i in range(3):
+        gcsbucket.put(f"dir/{i}", str(i))
+    children = list(GCSPath(f"{gcsbucket.root}dir").iterdir())
+
+    gcsbucket.requests.clear()
+    assert sorted(c.read_text() for c in children) == ["0", "1", "2"]
+    assert len(gcsbucket.requests) == 3
+
+
+@pytest.fixture
+def implicit_dirs():
+    GCSPath.implicit_dirs = True
+    yield
+    GCSPath.implicit_dirs = False
+
+
+@pytest.mark.parametrize(
+    ["pathstr", "expect"],
+    [("dir", True), ("dir/sub", True), ("dir/sub/file", False), ("missing", False)],
+)
+def test_is_dir_implicit(implicit_dirs, gcsbucket, pathstr, expect):
+    gcsbucket.put("dir/sub/file")
+    p = GCSPath(f"{gcsbucket.root}{pathstr}")
+
+    gcsbucket.requests.clear()
+    assert p.is_dir() == expect
+    assert len(gcsbucket.requests) == 1
+
+
+def test_mkdir_implicit(implicit_dirs, gcsbucket):
+    gcsbucket.requests.clear()
+    GCSPath(f"{gcsbucket.root}a/b/c").mkdir()
+    GCSPath(f"{gcsbucket.root}a/b/c").mkdir(parents=True)
+    assert len(gcsbucket.requests) == 0
+    assert list(gcsbucket._client.list_blobs(gcsbucket.name)) == []
+
+
+@pytest.mark.parametrize(["exists", "requests"], [(False, 2), (True, 1)])
+def test_touch_implicit(implicit_dirs, gcsbucket, exists, requests):
+    if exists:
+        gcsbucket.put("a/b/file")
+    p = GCSPath(f"{gcsbucket.root}a/b/file")
+
+    gcsbucket.requests.clear()
+    p.touch()
+    assert len(gcsbucket.requests) == requests
+    assert p.is_file()
+
+
+@pytest.fixture
+def metadata_cache():
+    metacache.enable_metadata_cache(ttl=60.0)
+    yield
+    metacache.disable_metadata_cache()
+
+
+@pytest.mark.parametrize(["key", "expect"], [("file", True), ("missing", False)])
+def test_exists_with_metadata_cache(metadata_cache, gcsbucket, key, expect):
+    gcsbucket.put("file")
+
+    gcsbucket.requests.clear()
+    for _ in range(3):
+        assert GCSPath(f"{gcsbucket.root}{key}").exists() == expect
+    assert len(gcsbucket.requests) == 1
+    assert metacache.metadata_cache_info()[:2] == (2, 1)
+
+
+def test_write_invalidates_metadata_cache(metadata_cache, gcsbucket):
+    dir_path = GCSPath(f"{gcsbucket.root}dir")
+    file_path = GCSPath(f"{gcsbucket.root}dir/file")
+    assert not dir_path.exists()
+    assert not file_path.exists()
+
+    GCSPath(f"{gcsbucket.root}dir/file").write_bytes(b"abc")
+    assert GCSPath(f"{gcsbucket.root}dir/file").stat().st_size == 3
+    assert GCSPath(f"{gcsbucket.root}dir").exists()
+
+
+@pytest.mark.parametrize(
+    "listing",
+    [lambda p: p.iterdir(), lambda p: p.glob("*"), lambda p: p.glob("**")],
+)
+def test_is_dir_stable_across_listing(metadata_cache, gcsbucket, listing):
+    gcsbucket.put("dir/prefix/file")
+    path = f"{gcsbucket.root}dir/prefix"
+    before = GCSPath(path).is_dir()
+
+    listed = {str(c): c for c in listing(GCSPath(f"{gcsbucket.root}dir"))}
+    assert listed[path].is_dir() == before
+    assert GCSPath(path).is_dir() == before
+    metacache._metadata_cache.clear()
+    assert GCSPath(path).is_dir() == before
+
+
+def test_listing_seeds_metadata_cache(metadata_cache, gcsbucket):
+    gcsbucket.put("dir/file", b"abc")
+    list(GCSPath(f"{gcsbucket.root}dir").iterdir())
+
+    gcsbucket.requests.clear()
+    p = GCSPath(f"{gcsbucket.root}dir/file")
+    assert p.is_file() and p.stat().st_size == 3
+    assert len(gcsbucket.requests) == 0
+
+
+@pytest.fixture
+def content_cache(tmp_path):
+    contentcache.enable_content_cache(str(tmp_path / "content"), 1024)
+    yield
+    contentcache.disable_content_cache()
+
+
+def test_read_with_content_cache(content_cache, gcsbucket):
+    gcsbucket.put("file", b"abc")
+
+    for _ in range(3):
+        assert GCSPath(f"{gcsbucket.root}file").read_text() == "abc"
+    downloads = [r for r in gcsbucket.requests if "alt=media" in r]
+    assert len(downloads) == 1
+    assert contentcache.content_cache_info()[:2] == (2, 1)
+
+    GCSPath(f"{gcsbucket.root}file").write_bytes(b"defg")
+    assert GCSPath(f"{gcsbucket.root}file").read_bytes() == b"defg"
+
+
+def test_content_cache_without_requests(content_cache, metadata_cache, gcsbucket):
+    gcsbucket.put("file", b"abc")
+    assert GCSPath(f"{gcsbucket.root}file").read_bytes() == b"abc"
+
+    gcsbucket.requests.clear()
+    with GCSPath(f"{gcsbucket.root}file").open("rb") as f:
+        assert f.read() == b"abc"
+    assert gcsbucket.requests == []
+
+
+def test_read_pinned_generation(gcsbucket):
+    gcsbucket.put("file", b"abc")
+    generation = gcsbucket.get("file").generation
+
+    p = GCSPath(f"{gcsbucket.root}file?generation={generation}")
+    assert p.stat().st_size == 3 and p.stat().version == str(generation)
+    assert p.is_file() and not p.is_dir()
+    assert p.read_bytes() == b"abc"
+    with p.open("rb") as f:
+        assert f.read() == b"abc"
+    with pytest.raises(ValueError):
+        p.write_bytes(b"x")
+
+
+def test_pinned_generation_never_expires(monkeypatch, metadata_cache, gcsbucket):
+    gcsbucket.put("file", b"abc")
+    generation = gcsbucket.get("file").generation
+    assert GCSPath(f"{gcsbucket.root}file").at_version(generation).exists()
+
+    later = metacache.time.monotonic() + 1e6
+    monkeypatch.setattr(metacache.time, "monotonic", lambda: later)
+    gcsbucket.requests.clear()
+    assert GCSPath(f"{gcsbucket.root}file").at_version(generation).exists()
+    assert gcsbucket.requests == []
+
+
+@pytest.mark.parametrize(
+    ["offset", "length", "expect"],
+    [(0, 3, b"abc"), (5, 10, b"fg"), (7, 3, b""), (2, 0, b"")],
+)
+def test_read_range(gcsbucket, offset, length, expect):
+    gcsbucket.put("file", b"abcdefg")
+
+    assert GCSPath(f"{gcsbucket.root}file").read_range(offset, length) == expect
+
+
+def test_open_with_block_cache(gcsbucket):
+    gcsbucket.put("file", b"0123456789abcdefghij")
+    blockcache.enable_block_cache(4, 1024, 1024)
+    try:
+        p = GCSPath(f"{gcsbucket.root}file")
+        assert p.read_range(8, 4) == b"89ab"
+        with p.open("rb") as f:
+            f.seek(-4, 2)
+            assert f.read() == b"ghij"
+            f.seek(0)
+            assert f.read() == b"0123456789abcdefghij"
+        assert blockcache.block_cache_info()[:2] == (2, 5)
+    finally:
+        blockcache.disable_block_cache()
+
+
+def test_read_ranges(gcsbucket):
+    data = bytes(range(256)) * 64
+    gcsbucket.put("file", data)
+
+    gcsbucket.requests.clear()
+    ranges = [(16380, 10), (0, 4), (10, 4), (8192, 16)]
+    views = GCSPath(f"{gcsbucket.root}file").read_ranges(ranges, max_gap=16)
+    assert [bytes(v) for v in views] == [data[o : o + n] for o, n in ranges]
+    assert len(gcsbucket.requests) == 3
+
+
+@pytest.mark.parametrize(
+    "pattern", ["*.py", "*", "*/*.py", "**", "**/*.py", "d*/**/*.txt"]
+)
+def test_glob(gcsbucket, tmp_path, pattern):
+    keys = ["a.py", "b.txt", "dir/c.py", "dir/sub/d.py", "dir/sub/e.txt", "marker/"]
+    for key in keys:
+        gcsbucket.put(key)
+        local = tmp_path.joinpath(key)
+        if key.endswith("/"):
+            local.mkdir(parents=True, exist_ok=True)
+        else:
+            local.parent.mkdir(parents=True, exist_ok=True)
+            local.touch()
+
+    root = GCSPath(gcsbucket.root)
+    actual = sorted(str(p.relative_to(root)) for p in root.glob(pattern))
+    expect = sorted(str(p.relative_to(tmp_path)) for p in tmp_path.glob(pattern))
+    assert actual == expect
+
+
+@pytest.mark.parametrize("top_down", [True, False])
+def test_walk(gcsbucket, top_down):
+    keys = ["a.py", "dir/c.py", "dir/sub/d.py", "dir/sub/e.txt", "marker/"]
+    for key in keys:
+        gcsbucket.put(key)
+
+    root = GCSPath(gcsbucket.root)
+    actual = [
+        (str(d.relative_to(root)), dirnames, filenames)
+        for d, dirnames, filenames in root.walk(top_down=top_down)
+    ]
+    expect = [
+        (".", ["dir", "marker"], ["a.py"]),
+        ("dir", ["sub"], ["c.py"]),
+        ("dir/sub", [], ["d.py", "e.txt"]),
+        ("marker", [], []),
+    ]
+    assert actual == (
+        expect if top_down else [expect[2], expect[1], expect[3], expect[0]]
+    )
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_iterdir_sharded(gcsbucket, ordered):
+    for key in ["dir/a", "dir/b/c", "dir/d", "dir/e/f", "dir/g"]:
+        gcsbucket.put(key)
+
+    p = GCSPath(f"{gcsbucket.root}dir")
+    expect = sorted(str(c) for c in p.iterdir())
+    actual = [str(c) for c in p.iterdir(max_workers=2, ordered=ordered)]
+    assert sorted(actual) == expect
+    assert len(actual) == 5
+
+
+def test_known_blob_client():
+    from paaaaath.gcs import _KnownBlobClient
+    from smart_open import smart_open_lib
+
+    calls = []
+    data = b"0123456789"
+
+    class Bucket:
+        name = "bucket"
+
+    class Blob:
+        name = "key"
+        bucket = Bucket()
+
+        def download_as_bytes(self, start=0, end=None):
+            calls.append(("download_as_bytes", start, end))
+            return data[start : None if end is None else end + 1]
+
+    class Client(_KnownBlobClient):
+        def bucket(self, name):
+            calls.append(("bucket", name))
+            return super().bucket(name)
+
+        def get_blob(self, key):
+            calls.append(("get_blob", key))
+            return super().get_blob(key)
+
+    client = Client(Blob(), len(data))
+    with smart_open_lib.open(
+        "gs://bucket/key", "rb", transport_params={"client": client}
+    ) as f:
+        assert f.read() == data
+        repr(f)
+    # smart_open must get the blob through these calls only, or reads
+    # through GCSPath would fetch the metadata again
+    assert calls[:2] == [("bucket", "bucket"), ("get_blob", "key")]
+    assert {c[0] for c in calls[2:]} == {"download_as_bytes"}
@@ -1,8 +1,10 @@
 import io
+import time
 
 import pytest
-from paaaaath import HttpPath, PureHttpPath
+from paaaaath import HttpPath, Path, PureHttpPath, httpcache
 from paaaaath.http import _http_flavour
+from werkzeug.wrappers import Response
 
 
 @pytest.mark.parametrize(
@@ -82,6 +84,36 @@ def test_exists(httpserver, pathstr, expect):
     assert HttpPath(httpserver.url_for(pathstr)).exists() == expect
 
 
+@pytest.mark.parametrize(
+    ["head", "methods"], [(True, ["HEAD"]), (False, ["HEAD", "GET"])]
+)
+def test_exists_without_body(http_cache, httpserver, head, methods):
+    def _handler(request):
+        if request.method == "HEAD" and not head:
+            return Response(status=405)
+        return Response(b"a" * 4096)
+
+    httpserver.expect_request("/foo").respond_with_handler(_handler)
+
+    assert HttpPath(httpserver.url_for("/foo")).exists()
+    assert [req.method for req, _ in httpserver.log] == methods
+    assert httpcache.http_cache_info().currbytes == 0
+
+
+def test_exists_many(httpserver):
+    httpserver.expect_request("/foo").respond_with_data()
+    paths = [HttpPath(httpserver.url_for(p)) for p in ["/foo", "/bar"]]
+
+    counters = {}
+    assert Path.exists_many(paths, counters=counters) == {
+        paths[0]: True,
+        paths[1]: False,
+    }
+    assert counters == {"probe": 2}
+    with pytest.raises(NotImplementedError):
+        Path.stat_many(paths)
+
+
 @pytest.mark.parametrize(
     ["mode", "file_cls", "expect"],
     [
@@ -119,3 +151,162 @@ def test_read_bytes(httpserver, expect):
 def test_read_text(httpserver, expect):
     httpserver.expect_request("/fileA").respond_with_data(expect)
     assert HttpPath(httpserver.url_for("/fileA")).read_text() == expect
+
+
+@pytest.fixture
+def http_cache():
+    httpcache.enable_http_cache(1024)
+    yield
+    httpcache.disable_http_cache()
+
+
+def _versioned_handler(body, headers):
+    def _handler(request):
+        etag = headers.get("ETag")
+        if etag is not None and request.headers.get("If-None-Match") == etag:
+            return Response(status=304, headers=headers)
+        return Response(body, headers=headers)
+
+    return _handler
+
+
+@pytest.mark.parametrize(
+    ["headers", "expect"],
+    [
+        ({"ETag": '"v1"'}, [200, 304, 304]),
+        ({"ETag": '"v1"', "Cache-Control": "max-age=60"}, [200]),
+        ({"ETag": '"v1"', "Cache-Control": "max-age=60", "Age": "60"}, [200, 304, 304]),
+        ({"ETag": '"v1"', "Cache-Control": "no-store"}, [200, 200, 200]),
+        ({"Cache-Control": "no-cache"}, [200, 200, 200]),
+        ({}, [200, 200, 200]),
+    ],
+)
+def test_read_with_http_cache(http_cache, httpserver, headers, expect):
+    httpserver.expect_request("/fileA").respond_with_handler(
+        _versioned_handler(b"abc", headers)
+    )
+
+    p = HttpPath(httpserver.url_for("/fileA"))
+    assert p.read_bytes() == b"abc"
+    assert p.read_text() == "abc"
+    with p.open("rb") as f:
+        assert f.read() == b"abc"
+    assert [res.status_code for _, res in httpserver.log] == expect
+
+
+def test_http_cache_if_modified_since(http_cache, httpserver):
+    modified = "Wed, 21 Oct 2015 07:28:00 GMT"
+
+    def _handler(request):
+        if request.headers.get("If-Modified-Since") == modified:
+            return Response(status=304)
+        return Response(b"abc", headers={"Last-Modified": modified})
+
+    httpserver.expect_request("/fileA").respond_with_handler(_handler)
+    for _ in range(2):
+        assert HttpPath(httpserver.url_for("/fileA")).read_bytes() == b"abc"
+    assert [res.status_code for _, res in httpserver.log] == [200, 304]
+    assert httpcache.http_cache_info()[:3] == (0, 1, 1)
+
+
+def test_http_cache_changed_resource(http_cache, httpserver):
+    bodies = iter([(b"abc", '"v1"'), (b"defg", '"v2"')])
+
+    def _handler(request):
+        body, etag = next(bodies)
+        return Response(body, headers={"ETag": etag})
+
+    httpserver.expect_request("/fileA").respond_with_handler(_handler)
+    p = HttpPath(httpserver.url_for("/fileA"))
+    assert p.read_bytes() == b"abc"
+    assert p.read_bytes() == b"defg"
+    assert httpserver.log[1][0].headers["If-None-Match"] == '"v1"'
+
+
+def test_http_cache_eviction(http_cache, httpserver):
+    for name in ["a", "b", "c"]:
+        httpserver.expect_request(f"/{name}").respond_with_data(
+            name * 500, headers={"Cache-Control": "max-age=60"}
+        )
+
+    for name in ["a", "b", "c", "c", "a"]:
+        assert HttpPath(httpserver.url_for(f"/{name}")).read_text() == name * 500
+    info = httpcache.http_cache_info()
+    assert (info.hits, info.misses, info.evictions, info.currbytes) == (1, 4, 2, 1000)
+
+
+@pytest.mark.parametrize("content_length", [True, False])
+def test_http_cache_large_body(http_cache, httpserver, content_length):
+    data = b"a" * 4096
+
+    def _handler(request):
+        if content_length:
+            return Response(data)
+        # Streamed without Content-Length
+        return Response(iter([data[:2048], data[2048:]]))
+
+    httpserver.expect_request("/large").respond_with_handler(_handler)
+    p = HttpPath(httpserver.url_for("/large"))
+    for _ in range(2):
+        assert p.read_bytes() == data
+    assert httpcache.http_cache_info().currbytes == 0
+    # Every read gives up on the cache and streams the body instead
+    assert len(httpserver.log) == 4
+
+
+def test_http_cache_error(http_cache, httpserver):
+    from requests.exceptions import HTTPError
+
+    with pytest.raises(HTTPError):
+        HttpPath(httpserver.url_for("/missing")).read_bytes()
+    assert not HttpPath(httpserver.url_for("/missing")).exists()
+
+
+def _range_handler(body):
+    def _handler(request):
+        if request.range is None:
+            return Response(body)
+        start, end = request.range.range_for_length(len(body))
+        headers = {"Content-Range": f"bytes {start}-{end - 1}/{len(body)}"}
+        return Response(body[start:end], status=206, headers=headers)
+
+    return _handler
+
+
+@pytest.mark.parametrize("supports_range", [True, False])
+def test_read_ranges(httpserver, supports_range):
+    data = bytes(range(256)) * 4
+    if supports_range:
+        httpserver.expect_request("/fileA").respond_with_handler(_range_handler(data))
+    else:
+        httpserver.expect_request("/fileA").respond_with_data(data)
+
+    p = HttpPath(httpserver.url_for("/fileA"))
+    ranges = [(1020, 10), (0, 4), (10, 4), (512, 16)]
+    views = p.read_ranges(ranges, max_gap=16)
+    assert [bytes(v) for v in views] == [data[o : o + n] for o, n in ranges]
+    assert p.read_range(100, 3) == data[100:103]
+    assert len(httpserver.log) == 4
+
+
+@pytest.mark.parametrize(
+    ["cached", "read"],
+    [
+        (False, lambda p: p.read_bytes()),
+        (True, lambda p: p.read_bytes()),
+        (False, lambda p: p.read_range(0, 1)),
+    ],
+)
+def test_timeout(request, httpserver, monkeypatch, cached, read):
+    from requests.exceptions import Timeout
+
+    def _handler(req):
+        time.sleep(0.5)
+        return Response(b"abc")
+
+    httpserver.expect_request("/slow").respond_with_handler(_handler)
+    monkeypatch.setattr(HttpPath, "timeout", 0.1)
+    if cached:
+        request.getfixturevalue("http_cache")
+    with pytest.raises(Timeout):
+        read(HttpPath(httpserver.url_for("/slow")))
@@ -0,0 +1,47 @@
+import subprocess
+import sys
+
+import pytest
+
+LAZY_MODULES = ["boto3", "botocore", "google.cloud.storage", "requests", "smart_open"]
+# Microseconds, a loose bound as the SDKs themselves are checked by name
+IMPORT_TIME_LIMIT = 1_000_000
+
+
+def _import_times(statement):
+    res = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+
+    times = {}
+    for line in res.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_import_time():
+    times = _import_times("import paaaaath")
+
+    assert times["paaaaath"] < IMPORT_TIME_LIMIT
+    for name in LAZY_MODULES:
+        assert name not in times
+
+
+@pytest.mark.parametrize(
+    ["statement", "expect"],
+    [
+        ("paaaaath.Path('s3://bucket/key').with_suffix('.txt')", []),
+        ("paaaaath.Path('s3://bucket/key')._client", ["boto3", "botocore"]),
+        ("paaaaath.Path('http://example.com').open", []),
+    ],
+)
+def test_lazy_import(statement, expect):
+    times = _import_times(f"import paaaaath; {statement}")
+    assert [name for name in LAZY_MODULES if name in times] == expect
@@ -0,0 +1,160 @@
+import multiprocessing
+
+import pytest
+from paaaaath import metacache
+from paaaaath.blob import BlobStat, dir_stat, file_stat
+from paaaaath.metacache import MetadataCache, MetadataCacheInfo, SQLiteMetadataCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(metacache.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(metacache.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_cache(request, tmp_path):
+    def _make_cache(*args, **kwargs):
+        if request.param == "memory":
+            return MetadataCache(*args, **kwargs)
+        return SQLiteMetadataCache(str(tmp_path / "cache.sqlite"), *args, **kwargs)
+
+    return _make_cache
+
+
+def test_get_put(make_cache):
+    cache = make_cache(4)
+    cache.put(("s3://bucket", "file"), file_stat(3, 0.0))
+    cache.put(("s3://bucket", "missing"), None)
+
+    assert cache.get(("s3://bucket", "file")) == (True, file_stat(3, 0.0))
+    assert cache.get(("s3://bucket", "missing")) == (True, None)
+    assert cache.get(("s3://bucket", "other")) == (False, None)
+    assert cache.info() == MetadataCacheInfo(2, 1, 0, 4, 2)
+
+
+@pytest.mark.parametrize(
+    ["stat_result", "negative_ttl", "expect"],
+    [
+        (dir_stat(), None, [True, True, False]),
+        (None, None, [True, True, False]),
+        (None, 5.0, [True, False, False]),
+        (None, 0.0, [False, False, False]),
+    ],
+)
+def test_ttl(clock, make_cache, stat_result, negative_ttl, expect):
+    cache = make_cache(4, ttl=10.0, negative_ttl=negative_ttl)
+    cache.put(("gs://bucket", "key"), stat_result)
+
+    actual = []
+    for t in [0.0, 9.0, 10.0]:
+        clock[0] = 1000.0 + t
+        actual.append(cache.get(("gs://bucket", "key"))[0])
+    assert actual == expect
+
+
+def test_lru_eviction(clock, make_cache):
+    cache = make_cache(2)
+    for op, key in [("put", "a"), ("put", "b"), ("get", "a"), ("put", "c")]:
+        clock[0] += 2.0
+        if op == "put":
+            cache.put(("s3://bucket", key), None)
+        else:
+            cache.get(("s3://bucket", key))
+
+    assert cache.get(("s3://bucket", "a"))[0]
+    assert not cache.get(("s3://bucket", "b"))[0]
+    assert cache.get(("s3://bucket", "c"))[0]
+    assert cache.info().evictions == 1
+
+
+def test_invalidate(make_cache):
+    cache = make_cache(2)
+    cache.put(("s3://bucket", "a"), None)
+    cache.invalidate(("s3://bucket", "a"))
+    cache.invalidate(("s3://bucket", "b"))
+
+    assert not cache.get(("s3://bucket", "a"))[0]
+    assert cache.info().currsize == 0
+
+
+def test_put_many(clock, make_cache):
+    cache = make_cache(3, ttl=10.0, negative_ttl=0.0)
+    cache.put_many(
+        [
+            (("s3://bucket", "a"), file_stat(1, 0.0)),
+            (("s3://bucket", "missing"), None),
+            (("s3://bucket", "b"), dir_stat()),
+        ]
+    )
+    cache.put_many([(("s3://bucket", "c"), None)], ttl=5.0)
+    cache.put_many([])
+
+    assert cache.get(("s3://bucket", "a")) == (True, file_stat(1, 0.0))
+    assert cache.get(("s3://bucket", "b")) == (True, dir_stat())
+    assert cache.get(("s3://bucket", "c")) == (True, None)
+    assert not cache.get(("s3://bucket", "missing"))[0]
+    clock[0] += 5.0
+    assert not cache.get(("s3://bucket", "c"))[0]
+
+
+def test_put_many_evicts(clock, make_cache):
+    cache = make_cache(2)
+    cache.put_many([(("s3://bucket", k), None) for k in "abcd"])
+    clock[0] += 1.0
+    cache.put(("s3://bucket", "e"), None)
+
+    assert cache.info().currsize <= 2
+    assert cache.get(("s3://bucket", "e"))[0]
+
+
+def test_invalid_maxsize(make_cache):
+    with pytest.raises(ValueError):
+        make_cache(0)
+
+
+def _put_entries(path, keys):
+    cache = SQLiteMetadataCache(path)
+    for key in keys:
+        cache.put(("s3://bucket", key), file_stat(len(key), 1.5, "etag", "1"))
+
+
+def test_sqlite_shared_between_processes(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = SQLiteMetadataCache(path)
+    cache.put(("s3://bucket", "missing"), None)
+
+    workers = [
+        multiprocessing.Process(target=_put_entries, args=(path, [f"{i}/a", f"{i}/b"]))
+        for i in range(4)
+    ]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    assert all(w.exitcode == 0 for w in workers)
+
+    actual = cache.get(("s3://bucket", "3/b"))
+    assert actual == (True, file_stat(3, 1.5, "etag", "1"))
+    assert isinstance(actual[1], BlobStat)
+    assert cache.info().currsize == 9
+    assert SQLiteMetadataCache(path).get(("s3://bucket", "missing")) == (True, None)
+
+
+def test_enable_disable():
+    metacache.enable_metadata_cache(8, ttl=1.0)
+    assert metacache.metadata_cache_info() == MetadataCacheInfo(0, 0, 0, 8, 0)
+    metacache.disable_metadata_cache()
+    assert metacache.metadata_cache_info() is None
+
+
+def test_enable_shared(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    metacache.enable_metadata_cache(8, path=path)
+    try:
+        assert isinstance(metacache._metadata_cache, SQLiteMetadataCache)
+        assert metacache._metadata_cache.path == path
+    finally:
+        metacache.disable_metadata_cache()
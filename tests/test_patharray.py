@@ -0,0 +1,142 @@
+import pickle
+
+import pytest
+from paaaaath import (
+    GCSPath,
+    Path,
+    PathArray,
+    PurePath,
+    PureS3Path,
+    S3Path,
+)
+
+uris = [
+    "s3://bucket",
+    "s3://bucket/a",
+    "s3://bucket/a/b.txt",
+    "s3://bucket//a/./c.tar.gz",
+    "s3://bucket/a//b/",
+    "s3://bucket/a/./",
+    "s3://bucket/a?b",
+    "S3://bucket/c",
+    "gs://bucket/a/.hidden",
+    "https://example.com/a/b.html",
+    "ftp://example.com/a/b.",
+    "/tmp/a/b.txt",
+    "a/b",
+    "",
+]
+
+
+@pytest.mark.parametrize(["path_cls"], [(PurePath,), (Path,)])
+def test_create(path_cls):
+    paths = PathArray(uris, path_cls)
+
+    assert len(paths) == len(uris)
+    for actual, uri in zip(paths, uris):
+        expect = path_cls(uri)
+        assert type(actual) is type(expect)
+        assert actual == expect
+        assert actual.parts == expect.parts
+
+
+def test_create_from_paths():
+    paths = [S3Path("s3://bucket/a"), GCSPath("gs://bucket/b"), PureS3Path("s3://b")]
+    assert list(PathArray(paths)) == paths
+
+
+def test_create_with_missing_class():
+    paths = PathArray(["ftp://example.com/a"], Path)
+    assert list(paths) == [Path("ftp://example.com/a")]
+
+
+def test_getitem():
+    paths = PathArray(uris)
+
+    assert paths[2] == PurePath(uris[2])
+    assert paths[-1] == PurePath(uris[-1])
+    assert list(paths[1:3]) == [PurePath(uri) for uri in uris[1:3]]
+
+
+@pytest.mark.parametrize(["attr"], [("name",), ("suffix",), ("stem",)])
+def test_str_attributes(attr):
+    paths = PathArray(uris)
+    assert getattr(paths, attr) == [getattr(PurePath(uri), attr) for uri in uris]
+
+
+def test_parent():
+    paths = PathArray(uris)
+    assert list(paths.parent) == [PurePath(uri).parent for uri in uris]
+    assert list(paths.parent.parent) == [PurePath(uri).parent.parent for uri in uris]
+
+
+@pytest.mark.parametrize(["suffix"], [(".json",), ("",)])
+def test_with_suffix(suffix):
+    targets = [uri for uri in uris if PurePath(uri).name != ""]
+    paths = PathArray(targets)
+    expect = [PurePath(uri).with_suffix(suffix) for uri in targets]
+    assert list(paths.with_suffix(suffix)) == expect
+
+
+@pytest.mark.parametrize(["suffix"], [("json",), (".",), ("./a",)])
+@pytest.mark.xfail(raises=ValueError)
+def test_with_suffix_invalid_suffix(suffix):
+    PathArray(["s3://bucket/a"]).with_suffix(suffix)
+
+
+@pytest.mark.xfail(raises=ValueError)
+def test_with_suffix_empty_name():
+    PathArray(["s3://bucket/a", "s3://bucket"]).with_suffix(".json")
+
+
+@pytest.mark.parametrize(
+    ["targets", "other"],
+    [
+        (["s3://bucket/a/b", "s3://bucket/a/c/d", "s3://bucket/a"], "s3://bucket/a"),
+        (["s3://bucket/a/b", "s3://bucket"], "s3://bucket"),
+        (["s3://bucket/a/b"], PureS3Path("s3://bucket/a")),
+        (["gs://bucket/a/b", "gs://bucket/a/c"], "gs://bucket/a"),
+        (["a/b", "a/c"], "a"),
+    ],
+)
+def test_relative_to(targets, other):
+    actual = list(PathArray(targets).relative_to(other))
+    expect = [PurePath(t).relative_to(other) for t in targets]
+
+    assert actual == expect
+    assert [type(p) for p in actual] == [type(p) for p in expect]
+
+
+@pytest.mark.parametrize(
+    ["targets", "other"],
+    [
+        (["s3://bucket/a/b", "s3://bucket/ab"], "s3://bucket/a"),
+        (["s3://bucket/a/b"], "gs://bucket/a"),
+        (["s3://bucket/a/b"], "s3://other/a"),
+        (["s3://bucket/a/b"], "a"),
+    ],
+)
+@pytest.mark.xfail(raises=ValueError)
+def test_relative_to_fail(targets, other):
+    PathArray(targets).relative_to(other)
+
+
+def test_repr():
+    assert repr(PathArray(["s3://bucket/a"])) == "PathArray(['s3://bucket/a'])"
+
+
+@pytest.mark.parametrize(
+    ["targets"],
+    [
+        (uris,),
+        ([],),
+        ([f"s3://bucket/prefix/{i}" for i in range(300)],),
+        ([f"s3://bucket{i}/prefix" for i in range(300)],),
+    ],
+)
+def test_pickling(targets):
+    paths = PathArray(targets)
+    for proto in range(0, pickle.HIGHEST_PROTOCOL + 1):
+        actual = pickle.loads(pickle.dumps(paths, proto))
+        assert list(actual) == list(paths)
+        assert list(actual.parent) == list(paths.parent)
@@ -0,0 +1,44 @@
+import threading
+
+import pytest
+from paaaaath.ranges import coalesce, read_ranges
+
+DATA = bytes(range(100))
+
+
+@pytest.mark.parametrize(
+    ["ranges", "max_gap", "max_size", "expect"],
+    [
+        ([(0, 10), (10, 10)], 0, 100, [(0, 20)]),
+        ([(30, 10), (0, 10), (12, 3)], 2, 100, [(0, 15), (30, 40)]),
+        ([(0, 10), (5, 3), (8, 10)], 0, 100, [(0, 18)]),
+        ([(0, 10), (15, 10)], 4, 100, [(0, 10), (15, 25)]),
+        ([(0, 10), (10, 10), (20, 10)], 0, 20, [(0, 20), (20, 30)]),
+        ([(0, 0), (5, 0)], 10, 100, []),
+    ],
+)
+def test_coalesce(ranges, max_gap, max_size, expect):
+    assert coalesce(ranges, max_gap, max_size) == expect
+
+
+def test_read_ranges():
+    fetches = []
+    threads = set()
+
+    def _fetch(start, end):
+        fetches.append((start, end))
+        threads.add(threading.get_ident())
+        return DATA[start:end]
+
+    ranges = [(90, 20), (0, 4), (50, 0), (6, 2), (40, 5), (2, 4)]
+    views = read_ranges(ranges, _fetch, max_gap=2, max_workers=4)
+
+    assert [bytes(v) for v in views] == [DATA[o : o + n] for o, n in ranges]
+    assert all(isinstance(v, memoryview) for v in views)
+    assert sorted(fetches) == [(0, 8), (40, 45), (90, 110)]
+    assert threading.get_ident() not in threads
+
+
+def test_read_ranges_fail():
+    with pytest.raises(ValueError):
+        read_ranges([(0, 1), (-1, 2)], lambda s, e: DATA[s:e])
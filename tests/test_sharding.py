@@ -0,0 +1,115 @@
+import bisect
+import threading
+
+import pytest
+from paaaaath.sharding import list_shards, sample_boundaries, split_keyspace
+
+KEYS = sorted(f"p/{c}{i:03d}" for c in "abcdefgh" for i in range(50))
+
+
+def _list_pages(keys, page_size=7):
+    def list_pages(start_after):
+        i = bisect.bisect_right(keys, start_after)
+        while i < len(keys):
+            yield [(k, None) for k in keys[i : i + page_size]]
+            i += page_size
+
+    return list_pages
+
+
+def _first_key_after(keys):
+    def first_key_after(start_after):
+        i = bisect.bisect_right(keys, start_after)
+        return keys[i] if i < len(keys) else None
+
+    return first_key_after
+
+
+@pytest.mark.parametrize(
+    ["shards", "alphabet", "expect"],
+    [
+        (1, "abcd", []),
+        (2, "abcd", ["p/c"]),
+        (4, "abcd", ["p/b", "p/c", "p/d"]),
+        (8, "abcd", ["p/ac", "p/ba", "p/bc", "p/ca", "p/cc", "p/da", "p/dc"]),
+    ],
+)
+def test_split_keyspace(shards, alphabet, expect):
+    assert split_keyspace("p/", shards, alphabet) == expect
+
+
+@pytest.mark.parametrize(
+    ["keys", "shards", "expect"],
+    [
+        (KEYS, 4, ["p/c", "p/e", "p/g"]),
+        (KEYS, 100, ["p/b", "p/c", "p/d", "p/e", "p/f", "p/g", "p/h"]),
+        (KEYS, 1, []),
+        (["p/2023-01", "p/2023-02", "p/2023-03"], 3, ["p/2023-01", "p/2023-02"]),
+        (["p/x"], 4, []),
+        ([], 4, []),
+    ],
+)
+def test_sample_boundaries(keys, shards, expect):
+    actual = sample_boundaries("p/", shards, _first_key_after(keys), "-0123abcdefgh")
+    assert actual == expect
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+@pytest.mark.parametrize(
+    "boundaries", [[], ["p/c"], ["p/a", "p/c020", "p/c021", "p/e", "p/z"], ["a", "q"]]
+)
+def test_list_shards(boundaries, ordered):
+    threads = set()
+    list_pages = _list_pages(KEYS)
+
+    def _list(start_after):
+        threads.add(threading.get_ident())
+        return list_pages(start_after)
+
+    pages = list_shards(boundaries, _list, max_workers=3, ordered=ordered)
+    actual = [k for page in pages for k, _ in page]
+    assert (actual if ordered else sorted(actual)) == KEYS
+    assert threading.get_ident() not in threads
+
+
+def test_list_shards_start_after():
+    pages = list_shards(["p/b", "p/e"], _list_pages(KEYS), start_after="p/c010")
+    assert [k for page in pages for k, _ in page] == [k for k in KEYS if "p/c010" < k]
+
+
+def test_list_shards_stops_at_end():
+    starts = []
+    pages_read = []
+
+    def _list(start_after):
+        starts.append(start_after)
+        for page in _list_pages(KEYS)(start_after):
+            pages_read.append(page)
+            yield page
+
+    list(list_shards(["p/e"], _list, max_workers=2))
+    assert sorted(starts) == ["", "p/e"]
+    # The first shard stops with the page passing its end
+    assert len(pages_read) <= len(range(0, len(KEYS), 7)) + 1
+
+
+def test_list_shards_fail():
+    def _list(start_after):
+        yield [("p/a", None)]
+        if start_after:
+            raise OSError("broken")
+
+    with pytest.raises(OSError):
+        list(list_shards(["p/a"], _list, max_workers=2))
+
+
+def test_list_shards_close():
+    def _list(start_after):
+        i = 0
+        while True:
+            yield [(f"{start_after}{i:09d}", None)]
+            i += 1
+
+    pages = list_shards(["b", "c"], _list, max_workers=3, ordered=False)
+    next(pages)
+    pages.close()
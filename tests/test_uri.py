@@ -1,5 +1,11 @@
 import pytest
-from paaaaath.uri import PureUriPath, _uri_flavour
+from paaaaath.uri import (
+    PureUriPath,
+    _uri_flavour,
+    disable_parse_cache,
+    enable_parse_cache,
+    parse_cache_info,
+)
 
 
 @pytest.mark.parametrize(
@@ -229,3 +235,62 @@ def test_joinpath(uri, succ, expect):
 )
 def test_match(uri, part, expect):
     assert PureUriPath(uri).match(part) == expect
+
+
+@pytest.fixture
+def parse_cache():
+    enable_parse_cache(2)
+    yield
+    disable_parse_cache()
+
+
+@pytest.mark.parametrize(
+    ["partsstr", "expect"],
+    [
+        (["http://example.com"], ("http://example.com", "/", ["http://example.com/"])),
+        (
+            ["http://example.com", "abc", "def"],
+            ("http://example.com", "/", ["http://example.com/", "abc", "def"]),
+        ),
+        (["abc", "/def"], ("", "/", ["/", "def"])),
+    ],
+)
+def test_cached_parse_parts(parse_cache, partsstr, expect):
+    assert _uri_flavour.parse_parts(partsstr) == expect
+    assert _uri_flavour.parse_parts(partsstr) == expect
+    assert parse_cache_info()["parse_parts"].hits == 1
+
+
+def test_cached_parse_parts_returns_copy(parse_cache):
+    _, _, parts = _uri_flavour.parse_parts(["http://example.com", "abc"])
+    parts.append("def")
+    _, _, parts = _uri_flavour.parse_parts(["http://example.com", "abc"])
+    assert parts == ["http://example.com/", "abc"]
+
+
+def test_parse_cache_is_bounded(parse_cache):
+    for uri in ["http://a.com", "http://b.com", "http://c.com", "http://a.com"]:
+        _uri_flavour.splitroot(uri)
+    info = parse_cache_info()["splitroot"]
+    assert (info.hits, info.misses, info.currsize, info.maxsize) == (0, 4, 2, 2)
+
+
+def test_parse_cache_is_shared_by_flavours(parse_cache):
+    from paaaaath.s3 import _s3_flavour
+
+    assert _uri_flavour.splitroot("s3://bucket") == ("s3://bucket", "/", "")
+    assert _s3_flavour.splitroot("s3://bucket") == ("s3://bucket", "/", "")
+    assert parse_cache_info()["splitroot"].hits == 1
+    with pytest.raises(ValueError):
+        _s3_flavour.splitroot("http://example.com")
+
+
+def test_parse_cache_is_disabled_by_default():
+    assert parse_cache_info() == {}
+
+
+def test_compile_pattern_is_cached():
+    match = _uri_flavour.compile_pattern("*.py")
+
+    assert match is _uri_flavour.compile_pattern("*.py")
+    assert match("a.py") and not match("a.txt")